@@ -16,6 +16,49 @@ class Settings(BaseSettings):
     secret_key: str = "your-secret-key-here"  # Change this in production
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    # Database settings (async driver; pool settings apply per worker process)
+    database_url: str = "sqlite+aiosqlite:///./auth.db"
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_recycle: int = 1800  # seconds
+    db_pool_timeout: int = 30  # seconds
+    sqlite_wal: bool = True
+    # Logging: "queue" hands records to a background writer thread, "sync" writes inline
+    log_mode: str = "queue"
+    log_dir: str = "logs"
+    log_max_bytes: int = 10 * 1024 * 1024
+    log_backup_count: int = 5
+    access_log_sample_rate: float = 1.0  # fraction of requests whose access lines are logged
+    # Password hashing pool ("process" or "thread"); logins beyond hash_max_pending get a 503
+    hash_executor: str = "process"
+    hash_workers: int = 2
+    hash_max_pending: int = 32
+    # Bulk user import: accounts allowed to call admin endpoints, hashing processes (0 = CPU count)
+    admin_usernames: list[str] = []
+    import_workers: int = 0
+    import_batch_size: int = 1000
+    # Verified-token cache (skips JWT decoding and the user lookup on repeat requests).
+    # Per process: a user disabled or deleted elsewhere (another worker, a Core
+    # UPDATE/DELETE) stays authenticated for up to auth_cache_ttl_seconds.
+    auth_cache_enabled: bool = True
+    auth_cache_max_size: int = 1024
+    auth_cache_ttl_seconds: int = 60
+    # Response cache for routes declared with cache_response (TTLs are set per route)
+    response_cache_enabled: bool = True
+    response_cache_max_entries: int = 1024
+    ping_cache_ttl_seconds: int = 5
+    # Deployment (serve.py); workers = 0 means one per CPU core
+    host: str = "127.0.0.1"
+    port: int = 8000
+    workers: int = 0
+    seed_on_start: bool = True
+    # Set by serve.py once the schema exists, so workers do not race on DDL
+    skip_schema_init: bool = False
+    # Give every process its own log files (app.<pid>.log), set by serve.py for multi-worker runs
+    log_per_process: bool = False
+    # Cold start: warn when import + lifespan startup exceeds the budget (see profile_startup.py)
+    startup_budget_ms: int = 1000
+    warm_up_on_start: bool = True
     # Add more config options as needed
 
     class Config:
@@ -1,20 +1,62 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+from app.config import settings
+from app.services.metrics import db_query_duration_seconds, db_session_duration_seconds
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./auth.db"
+SQLALCHEMY_DATABASE_URL = settings.database_url
+# Synchronous twin of the async URL (e.g. sqlite+aiosqlite -> sqlite) for scripts and DDL
+SYNC_DATABASE_URL = make_url(SQLALCHEMY_DATABASE_URL).set(
+    drivername=make_url(SQLALCHEMY_DATABASE_URL).get_backend_name()
+)
+IS_SQLITE = make_url(SQLALCHEMY_DATABASE_URL).get_backend_name() == "sqlite"
+
+connect_args = {"check_same_thread": False} if IS_SQLITE else {}
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+async_engine = create_async_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args=connect_args,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_recycle=settings.db_pool_recycle,
+    pool_timeout=settings.db_pool_timeout,
+    pool_pre_ping=True,
 )
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+engine = create_engine(SYNC_DATABASE_URL, connect_args=connect_args)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers proceed while a writer commits; NORMAL sync is safe in WAL mode
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={settings.db_pool_timeout * 1000}")
+    cursor.close()
+
+if IS_SQLITE and settings.sqlite_wal:
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+@event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+def _record_query_time(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    db_query_duration_seconds.observe(elapsed, statement.lstrip().split(None, 1)[0].upper())
+
 # Dependency to get DB session
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
\ No newline at end of file
+async def get_db():
+    start_time = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        finally:
+            db_session_duration_seconds.observe(time.perf_counter() - start_time)
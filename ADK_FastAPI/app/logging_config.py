@@ -1,67 +1,122 @@
+import atexit
 import logging
 import logging.config
+import os
+import random
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from queue import SimpleQueue
+from app.config import settings
 
-# Create logs directory if it doesn't exist
-logs_dir = Path("logs")
-logs_dir.mkdir(exist_ok=True)
-
-LOGGING_CONFIG = {
-    "version": 1,
-    "disable_existing_loggers": False,
-    "formatters": {
-        "default": {
-            "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        },
-        "detailed": {
-            "format": "%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s",
-        },
-    },
-    "handlers": {
-        "console": {
-            "class": "logging.StreamHandler",
-            "formatter": "default",
-            "level": "INFO",
+def build_logging_config():
+    """Return the dictConfig used by setup_logging, with file sinks under settings.log_dir"""
+    logs_dir = Path(settings.log_dir)
+    # Rotating handlers cannot share a file across processes, so workers get their own sink
+    suffix = f".{os.getpid()}" if settings.log_per_process else ""
+    file_handler = {
+        "class": "logging.handlers.RotatingFileHandler",
+        "maxBytes": settings.log_max_bytes,
+        "backupCount": settings.log_backup_count,
+        "encoding": "utf-8",
+        "delay": True,
+    }
+    return {
+        "version": 1,
+        "disable_existing_loggers": False,
+        "formatters": {
+            "default": {
+                "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+            },
+            "detailed": {
+                "format": "%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s",
+            },
         },
-        "file": {
-            "class": "logging.FileHandler",
-            "filename": "logs/app.log",
-            "formatter": "detailed",
-            "level": "DEBUG",
-        },
-        "error_file": {
-            "class": "logging.FileHandler",
-            "filename": "logs/error.log",
-            "formatter": "detailed",
-            "level": "ERROR",
+        "handlers": {
+            "console": {
+                "class": "logging.StreamHandler",
+                "formatter": "default",
+                "level": "INFO",
+            },
+            "file": {
+                **file_handler,
+                "filename": str(logs_dir / f"app{suffix}.log"),
+                "formatter": "detailed",
+                "level": "DEBUG",
+            },
+            "error_file": {
+                **file_handler,
+                "filename": str(logs_dir / f"error{suffix}.log"),
+                "formatter": "detailed",
+                "level": "ERROR",
+            },
         },
-    },
-    "root": {
-        "level": "DEBUG",
-        "handlers": ["console", "file", "error_file"],
-    },
-    "loggers": {
-        "app": {
+        "root": {
             "level": "DEBUG",
             "handlers": ["console", "file", "error_file"],
-            "propagate": False,
-        },
-        "uvicorn": {
-            "level": "INFO",
-            "handlers": ["console", "file"],
-            "propagate": False,
         },
-        "uvicorn.access": {
-            "level": "INFO",
-            "handlers": ["console", "file"],
-            "propagate": False,
+        "loggers": {
+            "app": {
+                "level": "DEBUG",
+                "handlers": ["console", "file", "error_file"],
+                "propagate": False,
+            },
+            "uvicorn": {
+                "level": "INFO",
+                "handlers": ["console", "file"],
+                "propagate": False,
+            },
+            "uvicorn.access": {
+                "level": "INFO",
+                "handlers": ["console", "file"],
+                "propagate": False,
+            },
         },
-    },
-}
+    }
+
+# Background writer used when settings.log_mode == "queue"
+_listener: QueueListener | None = None
 
 def setup_logging():
     """Setup logging configuration"""
-    logging.config.dictConfig(LOGGING_CONFIG)
+    Path(settings.log_dir).mkdir(parents=True, exist_ok=True)
+    config = build_logging_config()
+    logging.config.dictConfig(config)
+    if settings.log_mode == "queue":
+        _start_queue_listener(["root", *config["loggers"]])
+
+def _start_queue_listener(logger_names):
+    """Move every configured handler behind a single queue drained by a writer thread.
+
+    Loggers keep only a QueueHandler, so emitting a record on the request path is an
+    in-memory enqueue; formatting to disk and console happens on the listener thread.
+    Handler levels are still honoured by the listener.
+    """
+    global _listener
+    shutdown_logging()
+    handlers = []
+    queue_handler = QueueHandler(SimpleQueue())
+    for name in logger_names:
+        target = logging.getLogger() if name == "root" else logging.getLogger(name)
+        for handler in target.handlers:
+            if handler not in handlers:
+                handlers.append(handler)
+        target.handlers = [queue_handler]
+    _listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+def shutdown_logging():
+    """Flush queued records and stop the background writer, if any"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(shutdown_logging)
+
+def should_log_access():
+    """Decide whether this request's access log lines are emitted (settings.access_log_sample_rate)"""
+    rate = settings.access_log_sample_rate
+    return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
 
 # Create logger instance
-logger = logging.getLogger("app")
\ No newline at end of file
+logger = logging.getLogger("app")
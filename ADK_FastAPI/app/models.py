@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 
 class PingResponse(BaseModel):
     message: str
@@ -22,7 +22,23 @@ class TokenData(BaseModel):
     username: Optional[str] = None
 
 class UserCreate(BaseModel):
-    username: str
-    email: str
+    username: str = Field(min_length=1)
+    email: str = Field(min_length=1)
     full_name: str
-    password: str
\ No newline at end of file
+    password: str = Field(min_length=1)
+
+class UserImportError(BaseModel):
+    line: int
+    error: str
+
+class UserImportReport(BaseModel):
+    received: int = 0
+    created: int = 0
+    skipped: int = 0
+    failed: int = 0
+    errors: List[UserImportError] = []
+
+    def add_error(self, line: int, error: str, limit: int):
+        self.failed += 1
+        if len(self.errors) < limit:
+            self.errors.append(UserImportError(line=line, error=error))
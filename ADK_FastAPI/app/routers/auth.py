@@ -1,46 +1,40 @@
+import io
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
-from app.models import Token, TokenData, User, UserInDB
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Token, TokenData, User, UserCreate, UserImportReport, UserInDB
 from app.config import settings
 from app.database import get_db
 from app.db_models import User as DBUser
 from app.logging_config import logger
-from sqlalchemy.orm import Session
-from app.models import Token, TokenData, User, UserInDB
-from app.config import settings
-from app.database import get_db
-from app.db_models import User as DBUser
-
-router = APIRouter()
+from app.services.password_service import HashingSaturated, hashing_pool
+from app.services.response_cache import CachedRoute, cache_response
+from app.services.token_cache import token_cache
+from app.services.user_import import detect_format, import_pool, import_users_async
 
-# Password hashing
-pwd_context = CryptContext(schemes=["sha256_crypt"], deprecated="auto")
+router = APIRouter(route_class=CachedRoute)
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+async def get_user(db: AsyncSession, username: str):
+    result = await db.execute(select(DBUser).where(DBUser.username == username))
+    return result.scalars().first()
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
-
-def get_user(db: Session, username: str):
-    return db.query(DBUser).filter(DBUser.username == username).first()
-
-def authenticate_user(db: Session, username: str, password: str):
-    user = get_user(db, username)
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    user = await get_user(db, username)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    if not await hashing_pool.verify(password, user.hashed_password):
         return False
     return user
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
+    # python-jose is imported on first use to keep it off the cold-start path
+    from jose import jwt
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -50,7 +44,19 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def get_principal(user: DBUser) -> User:
+    return User(
+        username=user.username,
+        email=user.email,
+        full_name=user.full_name,
+        disabled=user.disabled
+    )
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
+    principal = token_cache.get(token)
+    if principal is not None:
+        return principal
+    from jose import JWTError, jwt
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -64,22 +70,37 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         token_data = TokenData(username=username)
     except JWTError:
         raise credentials_exception
-    user = get_user(db, username=token_data.username)
+    user = await get_user(db, username=token_data.username)
     if user is None:
         raise credentials_exception
-    return user
+    principal = get_principal(user)
+    token_cache.set(token, principal, expires_at=payload["exp"])
+    return principal
 
-async def get_current_active_user(current_user: DBUser = Depends(get_current_user)):
+async def get_current_active_user(current_user: User = Depends(get_current_user)):
     if current_user.disabled:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
+async def get_current_admin_user(current_user: User = Depends(get_current_active_user)):
+    if current_user.username not in settings.admin_usernames:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+    return current_user
+
 @router.post("/token", response_model=Token, summary="Login and get access token", tags=["Authentication"])
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    logger.info(f"Login attempt for user: {form_data.username}")
-    user = authenticate_user(db, form_data.username, form_data.password)
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+    logger.info("Login attempt for user: %s", form_data.username)
+    try:
+        user = await authenticate_user(db, form_data.username, form_data.password)
+    except HashingSaturated:
+        logger.warning("Hashing pool saturated, rejecting login for user: %s", form_data.username)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent logins, retry shortly",
+            headers={"Retry-After": "1"},
+        )
     if not user:
-        logger.warning(f"Failed login attempt for user: {form_data.username}")
+        logger.warning("Failed login attempt for user: %s", form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -89,15 +110,56 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
     access_token = create_access_token(
         data={"sub": user.username}, expires_delta=access_token_expires
     )
-    logger.info(f"Successful login for user: {user.username}")
+    logger.info("Successful login for user: %s", user.username)
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/users/me", response_model=User, summary="Get current user info", tags=["Authentication"])
-async def read_users_me(current_user: DBUser = Depends(get_current_active_user)):
-    logger.info(f"User info requested for: {current_user.username}")
-    return User(
-        username=current_user.username,
-        email=current_user.email,
-        full_name=current_user.full_name,
-        disabled=current_user.disabled
-    )
\ No newline at end of file
+@cache_response(ttl=30, per_principal=True)
+async def read_users_me(current_user: User = Depends(get_current_active_user)):
+    logger.info("User info requested for: %s", current_user.username)
+    return current_user
+
+@router.get("/cache/stats", summary="Verified-token cache counters (admin)", tags=["Authentication"])
+def read_token_cache_stats(admin: User = Depends(get_current_admin_user)):
+    return token_cache.stats()
+
+@router.post("/users", response_model=User, status_code=status.HTTP_201_CREATED, summary="Create a user (admin)", tags=["Users"])
+async def create_user(user_in: UserCreate, db: AsyncSession = Depends(get_db), admin: User = Depends(get_current_admin_user)):
+    try:
+        hashed_password = await hashing_pool.hash(user_in.password)
+    except HashingSaturated:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Hashing pool saturated", headers={"Retry-After": "1"})
+    user = DBUser(
+        username=user_in.username,
+        email=user_in.email,
+        full_name=user_in.full_name,
+        hashed_password=hashed_password,
+        disabled=False
+    )
+    db.add(user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Username or email already exists")
+    logger.info("User %s created by %s", user.username, admin.username)
+    return get_principal(user)
+
+@router.post("/users/bulk", response_model=UserImportReport, summary="Bulk import users from CSV or JSONL (admin)", tags=["Users"])
+async def bulk_import_users(
+    file: UploadFile = File(..., description="CSV with a header row or JSON Lines; fields: username, email, full_name, password"),
+    format: str | None = Query(None, description="csv or jsonl; inferred from the file name when omitted"),
+    batch_size: int = Query(settings.import_batch_size, ge=1, le=10000),
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(get_current_admin_user),
+):
+    try:
+        fmt = detect_format(file.filename, format)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    logger.info("Bulk import of %s (%s) started by %s", file.filename, fmt, admin.username)
+    lines = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    try:
+        return await import_users_async(db, lines, fmt, import_pool, batch_size=batch_size)
+    except HashingSaturated:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="An import is already running", headers={"Retry-After": "5"})
@@ -2,15 +2,17 @@ from fastapi import APIRouter, HTTPException, Depends
 from app.config import settings
 from app.models import User
 from app.logging_config import logger
+from app.services.response_cache import CachedRoute, cache_response
 
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
 
 # Import the dependency from auth router
 from app.routers.auth import get_current_active_user
 
 @router.get("/google/status", summary="Check Google API key status", tags=["Google"])
+@cache_response(ttl=60, per_principal=True)
 def google_status(current_user: User = Depends(get_current_active_user)):
-    logger.info(f"Google status check requested by user: {current_user.username}")
+    logger.info("Google status check requested by user: %s", current_user.username)
     if settings.google_api_key:
         logger.debug("Google API key is configured")
         return {"api_key_loaded": True, "message": "Google API key is loaded"}
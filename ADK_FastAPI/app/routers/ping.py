@@ -1,13 +1,16 @@
 from fastapi import APIRouter
 from app.models import PingResponse
 from app.services.ping_service import get_ping_message
+from app.config import settings
 from app.logging_config import logger
+from app.services.response_cache import CachedRoute, cache_response
 
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
 
 @router.get("/ping", response_model=PingResponse, summary="Ping the server", tags=["Health"])
+@cache_response(ttl=settings.ping_cache_ttl_seconds)
 def ping():
     logger.info("Ping endpoint called")
     message = get_ping_message()
-    logger.debug(f"Ping response: {message}")
+    logger.debug("Ping response: %s", message)
     return PingResponse(message=message)
\ No newline at end of file
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from app.config import settings
+from app.logging_config import logger
+
+# Password hashing context, built on first use (passlib is slow to import)
+_pwd_context = None
+
+
+class HashingSaturated(Exception):
+    """Raised when the hashing pool already has ``max_pending`` jobs queued or running."""
+
+
+def get_pwd_context():
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        _pwd_context = CryptContext(schemes=["sha256_crypt"], deprecated="auto")
+    return _pwd_context
+
+
+def verify_password(plain_password, hashed_password):
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+
+def get_password_hash(password):
+    return get_pwd_context().hash(password)
+
+
+class HashingPool:
+    """Runs the CPU-heavy sha256_crypt work off the event loop.
+
+    Jobs go to a dedicated process (or thread) pool; once ``max_pending`` jobs
+    are in flight new submissions fail fast with ``HashingSaturated`` instead
+    of queueing without bound.
+    """
+
+    def __init__(self, mode: str = "process", workers: int = 2, max_pending: int = 32):
+        self.mode = mode
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Executor | None = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hashing")
+            logger.info("Started %s hashing pool with %s workers", self.mode, self.workers)
+        return self._executor
+
+    async def run(self, func, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HashingSaturated()
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def verify(self, plain_password, hashed_password):
+        return await self.run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password):
+        return await self.run(get_password_hash, password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hashing_pool = HashingPool(
+    mode=settings.hash_executor,
+    workers=settings.hash_workers,
+    max_pending=settings.hash_max_pending,
+)
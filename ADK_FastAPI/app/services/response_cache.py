@@ -0,0 +1,161 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from starlette.status import HTTP_304_NOT_MODIFIED
+
+from app.config import settings
+from app.services.metrics import Counter, registry, route_label
+from app.services.token_cache import token_cache
+
+response_cache_lookups_total = registry.register(Counter(
+    "http_response_cache_total", "Response cache lookups by route and result.", ("route", "result")
+))
+
+
+class CachePolicy:
+    def __init__(self, ttl: int, per_principal: bool = False):
+        self.ttl = ttl
+        self.per_principal = per_principal
+
+
+def cache_response(ttl: int, per_principal: bool = False):
+    """Declare a response cache policy on an endpoint of a router using ``CachedRoute``.
+
+    Apply it below the router decorator. ``per_principal`` keys entries by the bearer
+    token, for endpoints whose response depends on the authenticated user.
+    """
+    def decorator(endpoint):
+        endpoint.cache_policy = CachePolicy(ttl, per_principal)
+        return endpoint
+    return decorator
+
+
+class CachedResponse:
+    def __init__(self, body: bytes, status_code: int, headers: dict, media_type: Optional[str], expires_at: float):
+        self.body = body
+        self.status_code = status_code
+        self.headers = headers
+        self.media_type = media_type
+        self.expires_at = expires_at
+        self.etag = f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+class ResponseCache:
+    """Bounded LRU of serialized responses with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CachedResponse):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache(
+    max_entries=settings.response_cache_max_entries if settings.response_cache_enabled else 0
+)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _bearer_token(request: Request) -> Optional[str]:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    return token if scheme.lower() == "bearer" and token else None
+
+
+def _render(entry: CachedResponse, request: Request, ttl: int, per_principal: bool) -> Response:
+    headers = {
+        **entry.headers,
+        "ETag": entry.etag,
+        "Cache-Control": f"{'private' if per_principal else 'public'}, max-age={ttl}",
+    }
+    if per_principal:
+        headers["Vary"] = "Authorization"
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, status_code=entry.status_code, headers=headers, media_type=entry.media_type)
+
+
+class CachedRoute(APIRoute):
+    """APIRoute serving GET responses from ``response_cache`` for endpoints decorated with ``cache_response``.
+
+    Only 200 responses are stored. Authenticated (per-principal) entries are served only
+    while the token is still present in the verified-token cache, so invalidating a user
+    there also bypasses their cached responses.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        policy: Optional[CachePolicy] = getattr(self.endpoint, "cache_policy", None)
+        if policy is None:
+            return handler
+
+        async def cached_route_handler(request: Request) -> Response:
+            if request.method != "GET":
+                return await handler(request)
+            key = f"{request.url.path}?{request.url.query}"
+            token = None
+            if policy.per_principal:
+                token = _bearer_token(request)
+                if token is None:
+                    return await handler(request)
+                key = f"{key}#{token_cache.key_for(token)}"
+
+            def principal_is_valid():
+                principal = token_cache.peek(token)
+                return principal is not None and not principal.disabled
+
+            entry = response_cache.get(key) if not policy.per_principal or principal_is_valid() else None
+            if entry is not None:
+                result = "not_modified" if _etag_matches(request.headers.get("if-none-match"), entry.etag) else "hit"
+                response_cache_lookups_total.inc(route_label(request), result)
+                return _render(entry, request, policy.ttl, policy.per_principal)
+
+            response_cache_lookups_total.inc(route_label(request), "miss")
+            response = await handler(request)
+            body = getattr(response, "body", None)
+            if response.status_code != 200 or body is None:
+                return response
+            headers = {
+                name: value for name, value in response.headers.items()
+                if name.lower() not in ("content-length", "etag", "cache-control", "vary")
+            }
+            entry = CachedResponse(body, response.status_code, headers, response.media_type, time.time() + policy.ttl)
+            # The handler has just verified the token, so it is in the token cache unless that is disabled
+            if not policy.per_principal or principal_is_valid():
+                response_cache.set(key, entry)
+            return _render(entry, request, policy.ttl, policy.per_principal)
+
+        return cached_route_handler
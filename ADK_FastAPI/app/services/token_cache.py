@@ -0,0 +1,154 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event, inspect
+
+from app.config import settings
+from app.db_models import User as DBUser
+from app.models import User
+from app.services.metrics import registry
+
+
+class TokenCache:
+    """Bounded in-process cache of verified tokens and their user principal.
+
+    Entries are keyed by a SHA-256 of the raw token, expire at the token's
+    ``exp`` claim (capped by ``ttl_seconds``) and are evicted least-recently-used
+    once ``max_size`` is reached.
+
+    Entries are invalidated only by ORM updates and deletes made in this process.
+    Other workers, and Core ``update()``/``delete()`` statements, leave them in
+    place, so a disabled or deleted user stays authenticated there for up to
+    ``ttl_seconds``.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: int = 60):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, User]]" = OrderedDict()
+        self._keys_by_user: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key_for(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[User]:
+        key = self.key_for(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, principal = entry
+            if expires_at <= now:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return principal
+
+    def peek(self, token: str) -> Optional[User]:
+        """Like get, but without touching counters or recency."""
+        with self._lock:
+            entry = self._entries.get(self.key_for(token))
+        if entry is None or entry[0] <= time.time():
+            return None
+        return entry[1]
+
+    def set(self, token: str, principal: User, expires_at: float):
+        if self.max_size <= 0:
+            return
+        expires_at = min(expires_at, time.time() + self.ttl_seconds)
+        key = self.key_for(token)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, principal)
+            self._keys_by_user.setdefault(principal.username, set()).add(key)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_user(self, username: str):
+        """Drop every cached token belonging to ``username``."""
+        with self._lock:
+            for key in self._keys_by_user.pop(username, set()):
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _remove(self, key: str):
+        _, principal = self._entries.pop(key)
+        keys = self._keys_by_user.get(principal.username)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[principal.username]
+
+
+token_cache = TokenCache(
+    max_size=settings.auth_cache_max_size if settings.auth_cache_enabled else 0,
+    ttl_seconds=settings.auth_cache_ttl_seconds,
+)
+
+
+# Drop cached principals as soon as a user row is modified or deleted through the ORM in this
+# process (Core statements and other workers do not fire these events; see TokenCache)
+@event.listens_for(DBUser, "after_update")
+@event.listens_for(DBUser, "after_delete")
+def _invalidate_changed_user(mapper, connection, target):
+    token_cache.invalidate_user(target.username)
+    history = inspect(target).attrs.username.history
+    for previous in history.deleted or ():
+        token_cache.invalidate_user(previous)
+
+
+@registry.register_collector
+def _token_cache_metrics():
+    stats = token_cache.stats()
+    return [
+        "# HELP auth_token_cache_lookups_total Verified-token cache lookups by result.",
+        "# TYPE auth_token_cache_lookups_total counter",
+        f'auth_token_cache_lookups_total{{result="hit"}} {stats["hits"]}',
+        f'auth_token_cache_lookups_total{{result="miss"}} {stats["misses"]}',
+        "# HELP auth_token_cache_evictions_total Entries evicted because the cache was full.",
+        "# TYPE auth_token_cache_evictions_total counter",
+        f"auth_token_cache_evictions_total {stats['evictions']}",
+        "# HELP auth_token_cache_invalidations_total Entries dropped because their user changed.",
+        "# TYPE auth_token_cache_invalidations_total counter",
+        f"auth_token_cache_invalidations_total {stats['invalidations']}",
+        "# HELP auth_token_cache_entries Verified tokens currently cached.",
+        "# TYPE auth_token_cache_entries gauge",
+        f"auth_token_cache_entries {stats['size']}",
+        "# HELP auth_token_cache_hit_ratio Fraction of lookups served from the cache since start.",
+        "# TYPE auth_token_cache_hit_ratio gauge",
+        f"auth_token_cache_hit_ratio {stats['hit_rate']}",
+    ]
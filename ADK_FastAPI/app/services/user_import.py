@@ -0,0 +1,201 @@
+import asyncio
+import csv
+import json
+import os
+from concurrent.futures import Executor
+from itertools import islice
+from typing import Iterable, Iterator
+
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db_models import User as DBUser
+from app.logging_config import logger
+from app.models import UserCreate, UserImportReport
+from app.services.password_service import HashingPool, get_password_hash
+
+# Maximum number of row errors echoed back in a report
+MAX_REPORTED_ERRORS = 50
+
+
+def detect_format(filename: str | None, declared: str | None = None) -> str:
+    fmt = (declared or (filename or "").rsplit(".", 1)[-1]).lower()
+    if fmt in ("jsonl", "ndjson", "json"):
+        return "jsonl"
+    if fmt == "csv":
+        return "csv"
+    raise ValueError(f"Unsupported import format: {fmt!r} (expected csv or jsonl)")
+
+
+def parse_users(lines: Iterable[str], fmt: str) -> Iterator[tuple[int, UserCreate | str]]:
+    """Yield (line number, UserCreate) for valid rows and (line number, error) for invalid ones.
+
+    Input is consumed lazily, so arbitrarily large files are streamed.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            if None in row:
+                yield reader.line_num, "invalid row: more fields than the header"
+                continue
+            try:
+                yield reader.line_num, UserCreate(**row)
+            except ValidationError as e:
+                yield reader.line_num, f"invalid row: {e.errors()[0]['msg']}"
+        return
+    for line_num, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_num, UserCreate(**json.loads(line))
+        except (ValueError, TypeError) as e:
+            message = e.errors()[0]["msg"] if isinstance(e, ValidationError) else str(e)
+            yield line_num, f"invalid row: {message}"
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def hash_chunk(passwords: list[str]) -> list[str]:
+    """Hash a list of passwords (runs inside a worker process)."""
+    return [get_password_hash(password) for password in passwords]
+
+
+def split(items: list, parts: int) -> list[list]:
+    size = max(1, -(-len(items) // parts))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+# Separate from the login hashing pool so a large import cannot starve logins
+import_pool = HashingPool(
+    mode="process",
+    workers=settings.import_workers or os.cpu_count() or 1,
+    max_pending=settings.import_workers or os.cpu_count() or 1,
+)
+
+
+def _prepare_batch(rows, report: UserImportReport):
+    """Split parsed rows into valid users (deduplicated within the batch) and record errors."""
+    users, seen_usernames, seen_emails = [], set(), set()
+    for line_num, item in rows:
+        report.received += 1
+        if isinstance(item, str):
+            report.add_error(line_num, item, MAX_REPORTED_ERRORS)
+        elif item.username in seen_usernames or item.email in seen_emails:
+            report.skipped += 1
+        else:
+            seen_usernames.add(item.username)
+            seen_emails.add(item.email)
+            users.append(item)
+    return users
+
+
+def _existing_query(users: list[UserCreate]):
+    return select(DBUser.username, DBUser.email).where(or_(
+        DBUser.username.in_([u.username for u in users]),
+        DBUser.email.in_([u.email for u in users]),
+    ))
+
+
+def _filter_new(users, existing):
+    taken_usernames = {username for username, _ in existing}
+    taken_emails = {email for _, email in existing}
+    return [u for u in users if u.username not in taken_usernames and u.email not in taken_emails]
+
+
+def _drop_taken(rows, existing):
+    taken_usernames = {username for username, _ in existing}
+    taken_emails = {email for _, email in existing}
+    return [r for r in rows if r["username"] not in taken_usernames and r["email"] not in taken_emails]
+
+
+def _count_conflict(rows, remaining, report: UserImportReport):
+    """Account for the rows dropped after a conflicting insert; returns the rows to retry."""
+    if len(remaining) == len(rows):
+        # The conflict is not on a username or email taken meanwhile: give up on the batch
+        report.failed += len(rows)
+        logger.error("Bulk import: a batch of %s users could not be inserted", len(rows))
+        return []
+    report.skipped += len(rows) - len(remaining)
+    return remaining
+
+
+def _rows(users, hashes):
+    return [
+        {
+            "username": u.username,
+            "email": u.email,
+            "full_name": u.full_name,
+            "hashed_password": hashed_password,
+            "disabled": False,
+        }
+        for u, hashed_password in zip(users, hashes)
+    ]
+
+
+def import_users(db: Session, lines: Iterable[str], fmt: str, executor: Executor,
+                 batch_size: int = 1000, workers: int = 1) -> UserImportReport:
+    """Synchronous bulk import used by the import_users.py CLI."""
+    report = UserImportReport()
+    for rows in batched(parse_users(lines, fmt), batch_size):
+        users = _prepare_batch(rows, report)
+        if not users:
+            continue
+        new_users = _filter_new(users, db.execute(_existing_query(users)).all())
+        report.skipped += len(users) - len(new_users)
+        if not new_users:
+            continue
+        hashes = [h for chunk in executor.map(hash_chunk, split([u.password for u in new_users], workers)) for h in chunk]
+        rows = _rows(new_users, hashes)
+        while rows:
+            try:
+                # One transaction and one executemany per batch
+                db.execute(insert(DBUser), rows)
+                db.commit()
+                report.created += len(rows)
+                break
+            except IntegrityError:
+                # Users created concurrently since the check: skip them and retry the rest
+                db.rollback()
+                rows = _count_conflict(rows, _drop_taken(rows, db.execute(_existing_query(new_users)).all()), report)
+        logger.info("Imported batch: %s created, %s skipped so far", report.created, report.skipped)
+    return report
+
+
+async def import_users_async(db: AsyncSession, lines: Iterable[str], fmt: str, pool: HashingPool,
+                             batch_size: int = 1000) -> UserImportReport:
+    """Bulk import for the admin endpoint; hashing runs in worker processes off the event loop."""
+    report = UserImportReport()
+    for rows in batched(parse_users(lines, fmt), batch_size):
+        users = _prepare_batch(rows, report)
+        if not users:
+            continue
+        new_users = _filter_new(users, (await db.execute(_existing_query(users))).all())
+        report.skipped += len(users) - len(new_users)
+        if not new_users:
+            continue
+        chunks = await asyncio.gather(*(
+            pool.run(hash_chunk, part) for part in split([u.password for u in new_users], pool.workers)
+        ))
+        rows = _rows(new_users, [h for chunk in chunks for h in chunk])
+        while rows:
+            try:
+                await db.execute(insert(DBUser), rows)
+                await db.commit()
+                report.created += len(rows)
+                break
+            except IntegrityError:
+                # Users created concurrently since the check: skip them and retry the rest
+                await db.rollback()
+                existing = (await db.execute(_existing_query(new_users))).all()
+                rows = _count_conflict(rows, _drop_taken(rows, existing), report)
+    logger.info("Bulk import finished: %s received, %s created, %s skipped, %s errors",
+                report.received, report.created, report.skipped, report.failed)
+    return report
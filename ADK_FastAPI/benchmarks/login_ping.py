@@ -0,0 +1,104 @@
+"""
+Login throughput benchmark.
+
+Starts the app with uvicorn on a free local port, keeps a number of logins in
+flight against /auth/token and measures /ping latency at the same time, so a
+blocked event loop shows up directly in the /ping percentiles.
+
+    python -m benchmarks.login_ping --concurrency 16 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+from benchmarks.common import free_port, percentile, start_server, stop_server, to_ms
+
+
+async def login_loop(client, stop, results, username, password):
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            response = await client.post("/auth/token", data={"username": username, "password": password})
+            results.append((response.status_code, time.perf_counter() - start))
+        except httpx.HTTPError:
+            results.append((None, time.perf_counter() - start))
+
+
+async def ping_loop(client, stop, latencies, interval):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/ping")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+
+
+async def measure(base_url, concurrency, duration, username, password, interval):
+    logins, pings = [], []
+    stop = asyncio.Event()
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        # A rejected login skips hashing, so the numbers would measure nothing
+        response = await client.post("/auth/token", data={"username": username, "password": password})
+        if response.status_code == 401:
+            raise SystemExit(
+                f"Login as {username!r} failed (401). Seed the database first (python seed_db.py) "
+                "or pass --username/--password of an existing user."
+            )
+        response.raise_for_status()
+        tasks = [asyncio.create_task(ping_loop(client, stop, pings, interval))]
+        tasks += [
+            asyncio.create_task(login_loop(client, stop, logins, username, password))
+            for _ in range(concurrency)
+        ]
+        await asyncio.sleep(duration)
+        stop.set()
+        await asyncio.gather(*tasks)
+    ok = [latency for code, latency in logins if code == 200]
+    return {
+        "concurrency": concurrency,
+        "duration_s": duration,
+        "logins": len(logins),
+        "logins_per_s": round(len(ok) / duration, 2),
+        "login_status_counts": {str(code): sum(1 for c, _ in logins if c == code) for code in {c for c, _ in logins}},
+        "login_p50_ms": to_ms(percentile(ok, 50)),
+        "login_p99_ms": to_ms(percentile(ok, 99)),
+        "ping_samples": len(pings),
+        "ping_p50_ms": to_ms(percentile(pings, 50)),
+        "ping_p99_ms": to_ms(percentile(pings, 99)),
+        "ping_mean_ms": to_ms(statistics.fmean(pings)) if pings else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Benchmark an already running server instead of starting one")
+    parser.add_argument("--concurrency", type=int, default=8, help="Logins kept in flight")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per run")
+    parser.add_argument("--ping-interval", type=float, default=0.01)
+    parser.add_argument("--username", default="testuser")
+    parser.add_argument("--password", default="password")
+    args = parser.parse_args()
+
+    process = None
+    base_url = args.url
+    if base_url is None:
+        # The local server uses the configured database; create the schema and the test user if missing
+        from serve import prepare_database
+        prepare_database()
+        port = free_port()
+        process = start_server(port)
+        base_url = f"http://127.0.0.1:{port}"
+    try:
+        report = asyncio.run(measure(base_url, args.concurrency, args.duration, args.username, args.password, args.ping_interval))
+    finally:
+        if process is not None:
+            stop_server(process)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
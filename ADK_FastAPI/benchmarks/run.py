@@ -0,0 +1,198 @@
+"""
+Load-test suite for the service.
+
+Drives concurrent traffic against /ping, /auth/token, /auth/users/me and
+/google/status with an async client and prints one JSON report (throughput,
+p50/p95/p99 latency, status counts and error rate per scenario).
+
+    python -m benchmarks.run                         # local uvicorn on a free port
+    python -m benchmarks.run --in-process            # ASGI transport, no sockets
+    python -m benchmarks.run --url http://host:8000  # already running server
+    python -m benchmarks.run --output current.json --compare baseline.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks.common import free_port, git_revision, percentile, start_server, stop_server, to_ms
+
+# name -> (method, path, needs auth token, statuses that are not errors)
+SCENARIOS = {
+    "ping": ("GET", "/ping", False, {200}),
+    "token": ("POST", "/auth/token", False, {200}),
+    "users_me": ("GET", "/auth/users/me", True, {200}),
+    # 400 means the Google API key is not configured, which is a valid answer
+    "google_status": ("GET", "/google/status", True, {200, 400}),
+}
+
+
+async def worker(client, scenario, stop, samples, credentials, headers):
+    method, path, _, _ = SCENARIOS[scenario]
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            if method == "POST":
+                response = await client.post(path, data=credentials)
+            else:
+                response = await client.get(path, headers=headers)
+            samples.append((response.status_code, time.perf_counter() - start))
+        except httpx.HTTPError:
+            samples.append((None, time.perf_counter() - start))
+
+
+async def run_scenario(client, scenario, concurrency, duration, credentials, headers):
+    samples = []
+    stop = asyncio.Event()
+    tasks = [
+        asyncio.create_task(worker(client, scenario, stop, samples, credentials, headers))
+        for _ in range(concurrency)
+    ]
+    started = time.perf_counter()
+    await asyncio.sleep(duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    return summarize(scenario, samples, elapsed, concurrency)
+
+
+def summarize(scenario, samples, elapsed, concurrency):
+    ok_statuses = SCENARIOS[scenario][3]
+    latencies = [latency for _, latency in samples]
+    errors = sum(1 for status, _ in samples if status not in ok_statuses)
+    status_counts = {}
+    for status, _ in samples:
+        status_counts[str(status)] = status_counts.get(str(status), 0) + 1
+    return {
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else None,
+        "p50_ms": to_ms(percentile(latencies, 50)),
+        "p95_ms": to_ms(percentile(latencies, 95)),
+        "p99_ms": to_ms(percentile(latencies, 99)),
+        "max_ms": to_ms(max(latencies)) if latencies else None,
+        "error_rate": round(errors / len(samples), 4) if samples else None,
+        "status_counts": status_counts,
+    }
+
+
+async def run_suite(client, args):
+    credentials = {"username": args.username, "password": args.password}
+    response = await client.post("/auth/token", data=credentials)
+    if response.status_code == 401:
+        raise SystemExit(
+            f"Login as {args.username!r} failed (401). Seed the database first (python seed_db.py) "
+            "or pass --username/--password of an existing user."
+        )
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    results = {}
+    for scenario in args.scenarios:
+        # Logins are CPU bound by design; cap their concurrency separately
+        concurrency = args.login_concurrency if scenario == "token" else args.concurrency
+        # Warm-up run is discarded (connection setup, caches, lazy imports)
+        if args.warmup > 0:
+            await run_scenario(client, scenario, concurrency, args.warmup, credentials, headers)
+        results[scenario] = await run_scenario(client, scenario, concurrency, args.duration, credentials, headers)
+    return results
+
+
+async def run_in_process(args):
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+            return await run_suite(client, args)
+
+
+async def run_over_http(base_url, args):
+    limits = httpx.Limits(max_connections=max(args.concurrency, args.login_concurrency))
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        return await run_suite(client, args)
+
+
+def compare(report, baseline):
+    """Relative change per scenario metric against a previous report (positive = slower/worse)."""
+    deltas = {}
+    for scenario, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(scenario)
+        if not previous:
+            continue
+        deltas[scenario] = {}
+        for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms", "error_rate"):
+            before, after = previous.get(metric), current.get(metric)
+            if before in (None, 0) or after is None:
+                continue
+            change = (after - before) / before
+            if metric == "throughput_rps":
+                change = -change
+            deltas[scenario][metric] = round(change, 4)
+    return {"baseline_revision": baseline.get("revision"), "relative_change": deltas}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="Benchmark an already running server")
+    target.add_argument("--in-process", action="store_true", help="Drive the ASGI app directly, without sockets")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers when starting a local server")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--login-concurrency", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Discarded warm-up seconds per scenario")
+    parser.add_argument("--username", default="testuser")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--compare", help="Previous JSON report to compute relative changes against")
+    args = parser.parse_args()
+
+    process = None
+    if args.url is None:
+        # The local app uses the configured database; create the schema and the test user if missing
+        from serve import prepare_database
+        prepare_database()
+    if args.in_process:
+        mode = "in-process"
+        results = asyncio.run(run_in_process(args))
+    else:
+        base_url = args.url
+        mode = "http"
+        if base_url is None:
+            port = free_port()
+            process = start_server(port, workers=args.workers)
+            base_url = f"http://127.0.0.1:{port}"
+            mode = f"uvicorn x{args.workers}"
+        try:
+            results = asyncio.run(run_over_http(base_url, args))
+        finally:
+            if process is not None:
+                stop_server(process)
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "mode": mode,
+        "duration_s": args.duration,
+        "scenarios": results,
+    }
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            report["comparison"] = compare(report, json.load(f))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
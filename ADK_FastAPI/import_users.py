@@ -0,0 +1,38 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.db_models import Base
+from app.logging_config import logger, setup_logging
+from app.services.user_import import detect_format, import_users
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import users from a CSV (with header) or JSON Lines file.")
+    parser.add_argument("path", help="File with username, email, full_name and password fields")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Inferred from the file extension by default")
+    parser.add_argument("--batch-size", type=int, default=settings.import_batch_size, help="Rows per transaction")
+    parser.add_argument("--workers", type=int, default=settings.import_workers or os.cpu_count() or 1,
+                        help="Password hashing processes")
+    args = parser.parse_args()
+
+    setup_logging()
+    Base.metadata.create_all(bind=engine)
+    fmt = detect_format(args.path, args.format)
+    start_time = time.perf_counter()
+    db = SessionLocal()
+    try:
+        with open(args.path, encoding="utf-8", newline="") as f, ProcessPoolExecutor(max_workers=args.workers) as executor:
+            report = import_users(db, f, fmt, executor, batch_size=args.batch_size, workers=args.workers)
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - start_time
+    logger.info("Import of %s finished in %.1fs: %s", args.path, elapsed, report.model_dump_json(exclude={"errors"}))
+    for error in report.errors:
+        print(f"line {error.line}: {error.error}", file=sys.stderr)
+    print(report.model_dump_json(indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from app.config import settings
+
+ROOT = Path(__file__).resolve().parent
+
+# Runs in a fresh interpreter: import the app, run its lifespan startup, report elapsed ms
+STARTUP_PROBE = """
+import asyncio, json, logging, time
+start = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+async def probe():
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        logging.disable(logging.CRITICAL)
+    return ready
+ready = asyncio.run(probe())
+print(json.dumps({"import_ms": (imported - start) * 1000, "ready_ms": (ready - start) * 1000}))
+"""
+
+def run_probe(args, env):
+    return subprocess.run(
+        [sys.executable, *args], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+
+def parse_importtime(stderr):
+    """Parse `-X importtime` output into (module, self_us, cumulative_us) rows"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((module.rstrip(), int(self_us), int(cumulative_us)))
+    return rows
+
+def heaviest_packages(rows):
+    """Largest cumulative import cost seen for each top-level package (its outermost import)"""
+    totals = {}
+    for module, _, cumulative in rows:
+        package = module.strip().split(".")[0]
+        totals[package] = max(totals.get(package, 0), cumulative)
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile application cold start (imports and lifespan startup).")
+    parser.add_argument("--top", type=int, default=20, help="Number of slowest modules to show")
+    parser.add_argument("--runs", type=int, default=3, help="Startup measurements (best run is compared to the budget)")
+    parser.add_argument("--budget-ms", type=int, default=settings.startup_budget_ms)
+    parser.add_argument("--json", action="store_true", help="Print a JSON report instead of a table")
+    args = parser.parse_args()
+
+    env = {**os.environ, "PYTHONPATH": str(ROOT), "WARM_UP_ON_START": "false", "LOG_MODE": "sync"}
+
+    profile = run_probe(["-X", "importtime", "-c", "import app.main"], env)
+    rows = parse_importtime(profile.stderr)
+    slowest = sorted(rows, key=lambda row: row[2], reverse=True)[:args.top]
+
+    runs = [json.loads(run_probe(["-c", STARTUP_PROBE], env).stdout.strip().splitlines()[-1]) for _ in range(args.runs)]
+    best = min(runs, key=lambda run: run["ready_ms"])
+    within_budget = best["ready_ms"] <= args.budget_ms
+
+    if args.json:
+        print(json.dumps({
+            "budget_ms": args.budget_ms,
+            "within_budget": within_budget,
+            "runs": runs,
+            "packages_us": dict(heaviest_packages(rows)),
+            "slowest_modules_us": [{"module": m.strip(), "self": s, "cumulative": c} for m, s, c in slowest],
+        }, indent=2))
+    else:
+        print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+        for module, self_us, cumulative_us in slowest:
+            print(f"{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {module.strip()}")
+        print()
+        print("Heaviest packages (ms): " + ", ".join(f"{p} {us / 1000:.0f}" for p, us in heaviest_packages(rows)[:8]))
+        for i, run in enumerate(runs, 1):
+            print(f"Run {i}: import {run['import_ms']:.0f} ms, ready {run['ready_ms']:.0f} ms")
+        status = "within" if within_budget else "OVER"
+        print(f"Best ready time {best['ready_ms']:.0f} ms, {status} the {args.budget_ms} ms budget")
+
+    sys.exit(0 if within_budget else 1)
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,7 @@
 from app.database import SessionLocal
 from app.db_models import User
-from passlib.context import CryptContext
 from app.logging_config import logger
-
-pwd_context = CryptContext(schemes=["sha256_crypt"])
+from app.services.password_service import get_password_hash
 
 def create_test_user():
     logger.info("Checking for existing test user...")
@@ -16,7 +14,7 @@ def create_test_user():
             return
 
         # Create test user
-        hashed_password = pwd_context.hash("password")
+        hashed_password = get_password_hash("password")
         test_user = User(
             username="testuser",
             email="test@example.com",
@@ -28,7 +26,7 @@ def create_test_user():
         db.commit()
         logger.info("Test user created successfully")
     except Exception as e:
-        logger.error(f"Error creating test user: {e}")
+        logger.error("Error creating test user: %s", e)
         db.rollback()
     finally:
         db.close()
@@ -0,0 +1,41 @@
+import argparse
+import os
+import uvicorn
+from app.config import settings
+from app.database import engine
+from app.db_models import Base
+from app.logging_config import setup_logging, shutdown_logging, logger
+from seed_db import create_test_user
+
+def prepare_database(seed=True):
+    """Create the schema and seed data once, before any worker process exists"""
+    logger.info("Preparing database schema...")
+    Base.metadata.create_all(bind=engine)
+    if seed:
+        create_test_user()
+    # Workers build their own engine and pool; do not hand them parent connections
+    engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the service with several uvicorn worker processes.")
+    parser.add_argument("--host", default=settings.host)
+    parser.add_argument("--port", type=int, default=settings.port)
+    parser.add_argument("--workers", type=int, default=settings.workers, help="0 = one per CPU core")
+    parser.add_argument("--no-seed", action="store_true", help="Skip creating the test user")
+    args = parser.parse_args()
+
+    workers = args.workers or os.cpu_count() or 1
+    setup_logging()
+    prepare_database(seed=settings.seed_on_start and not args.no_seed)
+    logger.info("Starting %s worker(s) on %s:%s", workers, args.host, args.port)
+    shutdown_logging()
+
+    # Inherited by the worker processes uvicorn spawns
+    os.environ["SKIP_SCHEMA_INIT"] = "1"
+    if workers > 1:
+        os.environ["LOG_PER_PROCESS"] = "1"
+
+    uvicorn.run("app.main:app", host=args.host, port=args.port, workers=workers, log_config=None)
+
+if __name__ == "__main__":
+    main()
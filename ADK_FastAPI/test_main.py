@@ -45,11 +45,36 @@ def test_unauthorized_google_status():
     assert response.status_code == 401
     print("✓ Unauthorized access test passed")
 
+def test_token_cache_stats(token):
+    print("Testing token cache counters...")
+    headers = {"Authorization": f"Bearer {token}"}
+    requests.get("http://127.0.0.1:8000/auth/users/me", headers=headers)
+    assert requests.get("http://127.0.0.1:8000/auth/cache/stats").status_code == 401
+    response = requests.get("http://127.0.0.1:8000/auth/cache/stats", headers=headers)
+    if response.status_code == 403:
+        print("✓ Token cache stats refused to non-admin (add testuser to ADMIN_USERNAMES to check the counters)")
+        return
+    assert response.status_code == 200
+    data = response.json()
+    assert data["hits"] >= 1
+    print("✓ Token cache stats test passed")
+
+def test_ping_etag():
+    print("Testing conditional GET on ping...")
+    response = requests.get("http://127.0.0.1:8000/ping")
+    etag = response.headers.get("ETag")
+    assert etag
+    response = requests.get("http://127.0.0.1:8000/ping", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    print("✓ Ping ETag test passed")
+
 if __name__ == "__main__":
     print("Starting FastAPI authentication tests...")
     test_ping()
+    test_ping_etag()
     token = test_login()
     test_google_status(token)
     test_get_current_user(token)
+    test_token_cache_stats(token)
     test_unauthorized_google_status()
     print("All tests passed! ✅")
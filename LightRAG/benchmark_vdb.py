@@ -0,0 +1,170 @@
+"""
+Load time and resident memory of the JSON vector stores vs. their memory-mapped version.
+
+Each store is loaded in a fresh interpreter, so the memory figures only cover that store.
+
+    python benchmark_vdb.py rag_storage                 # stores already migrated with migrate_vdb.py
+    python benchmark_vdb.py --synthetic 50000           # generated store, 1024-dim vectors
+    python benchmark_vdb.py --synthetic 50000 --clusters 500 --index   # IVF recall and latency per nprobe
+"""
+import os
+import sys
+import json
+import time
+import base64
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+import numpy as np
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource  # peak RSS, where /proc is not available
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _measure(kind, working_dir, namespace, queries):
+    """Runs in the child interpreter: load one store, run a few top-20 queries."""
+    # Imports are not part of loading a store (mmap_vector_storage pulls in lightrag)
+    from nano_vectordb import NanoVectorDB
+    from mmap_vector_storage import MmapVectorFile
+    before = rss_mb()
+    start = time.perf_counter()
+    if kind == "json":
+        with open(os.path.join(working_dir, f"vdb_{namespace}.json"), encoding="utf-8") as f:
+            embedding_dim = json.load(f)["embedding_dim"]
+        store = NanoVectorDB(embedding_dim, storage_file=os.path.join(working_dir, f"vdb_{namespace}.json"))
+        count = len(store)
+        query = lambda q: store.query(q, top_k=20)
+    else:
+        with open(os.path.join(working_dir, f"vdb_{namespace}.index.jsonl"), encoding="utf-8") as f:
+            embedding_dim = json.loads(f.readline())["embedding_dim"]
+        store = MmapVectorFile(working_dir, namespace, embedding_dim)
+        count = len(store.records)
+        query = lambda q: np.argpartition(-store.scores(q), min(20, count) - 1)[:20]
+    load_ms = (time.perf_counter() - start) * 1000
+    after_load = rss_mb()
+    rng = np.random.default_rng(0)
+    timings = []
+    for _ in range(queries if count else 0):
+        q = rng.standard_normal(embedding_dim).astype(np.float32)
+        start = time.perf_counter()
+        query(q)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "vectors": count, "load_ms": load_ms, "rss_load_mb": after_load - before,
+        "rss_query_mb": rss_mb() - before, "query_ms": float(np.median(timings)) if timings else 0.0,
+    }
+
+def measure(kind, working_dir, namespace, queries=20):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", kind, working_dir, namespace, str(queries)],
+        capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def make_synthetic(directory, count, embedding_dim=1024, dtype="float32", clusters=0):
+    """Write a NanoVectorDB JSON store of random vectors (around `clusters` centers) and migrate it."""
+    from mmap_vector_storage import migrate_nano_json
+    rng = np.random.default_rng(0)
+    matrix = rng.standard_normal((count, embedding_dim)).astype(np.float32)
+    if clusters:
+        centers = rng.standard_normal((clusters, embedding_dim)).astype(np.float32)
+        matrix += centers[rng.integers(0, clusters, count)]
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    data = [{"__id__": f"ent-{i:08d}", "__created_at__": time.time(), "entity_name": f"Entity {i}",
+             "content": f"Entity {i} description", "source_id": "chunk-0", "file_path": "synthetic"} for i in range(count)]
+    with open(os.path.join(directory, "vdb_entities.json"), "w", encoding="utf-8") as f:
+        json.dump({"embedding_dim": embedding_dim, "data": data,
+                   "matrix": base64.b64encode(matrix.tobytes()).decode()}, f)
+    migrate_nano_json(os.path.join(directory, "vdb_entities.json"), directory, "entities", dtype)
+
+def measure_index(working_dir, namespace, queries=50, k=20, nprobes=(4, 8, 16, 32, 64)):
+    """Recall of the IVF index against an exact search, and latency, for each nprobe."""
+    from mmap_vector_storage import MmapVectorFile
+    from vector_index import ExactIndex, IVFIndex
+    with open(os.path.join(working_dir, f"vdb_{namespace}.index.jsonl"), encoding="utf-8") as f:
+        embedding_dim = json.loads(f.readline())["embedding_dim"]
+    store = MmapVectorFile(working_dir, namespace, embedding_dim)
+    if len(store.records) <= k:
+        return []
+    start = time.perf_counter()
+    index = IVFIndex(store, min_rows=1)
+    index.train()
+    train_ms = (time.perf_counter() - start) * 1000
+    # Queries near stored vectors, as a question is close to the passages that answer it
+    rng = np.random.default_rng(0)
+    live = np.flatnonzero(store.live)
+    matrix = store.matrix()
+    queries = [np.asarray(matrix[row], dtype=np.float32) + rng.standard_normal(embedding_dim).astype(np.float32) * 0.02
+               for row in rng.choice(live, queries)]
+    rows = []
+    for name, search in [("exact", ExactIndex(store).search)] + [(f"ivf/{n}", index.search) for n in nprobes]:
+        if name != "exact":
+            index.nprobe = int(name.split("/")[1])
+        timings, found = [], []
+        for query in queries:
+            start = time.perf_counter()
+            found.append(set(search(query, k)[0].tolist()))
+            timings.append((time.perf_counter() - start) * 1000)
+        if name == "exact":
+            truth = found
+        recall = np.mean([len(a & b) / k for a, b in zip(found, truth)])
+        rows.append((name, float(np.median(timings)), float(recall)))
+    print(f"{namespace}: {len(store.records)} vectors, {len(index.centroids)} IVF lists trained in {train_ms:.0f} ms")
+    return rows
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        kind, working_dir, namespace, queries = sys.argv[2:6]
+        print(json.dumps(_measure(kind, working_dir, namespace, int(queries))))
+        return
+    parser = argparse.ArgumentParser(description="Compare JSON and memory-mapped LightRAG vector stores.")
+    parser.add_argument("working_dir", nargs="?", help="Working directory with vdb_*.json and their migrated files")
+    parser.add_argument("--synthetic", type=int, help="Benchmark a generated store with this many vectors instead")
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float16"], help="dtype of the generated store")
+    parser.add_argument("--clusters", type=int, default=0, help="Generate the vectors around this many centers")
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--index", action="store_true", help="Compare exact and IVF search instead of the formats")
+    args = parser.parse_args()
+    if not args.working_dir and not args.synthetic:
+        parser.error("give a working directory or --synthetic N")
+
+    tmp = None
+    working_dir = args.working_dir
+    if args.synthetic:
+        working_dir = tmp = tempfile.mkdtemp(prefix="vdb-bench-")
+        make_synthetic(working_dir, args.synthetic, dtype=args.dtype, clusters=args.clusters)
+    try:
+        namespaces = sorted(
+            name[len("vdb_"):-len(".index.jsonl")] for name in os.listdir(working_dir)
+            if name.startswith("vdb_") and name.endswith(".index.jsonl")
+            and os.path.exists(os.path.join(working_dir, name.replace(".index.jsonl", ".json")))
+        )
+        if not namespaces:
+            raise SystemExit(f"No migrated store in {working_dir}: run migrate_vdb.py first")
+        if args.index:
+            for namespace in namespaces:
+                for name, query_ms, recall in measure_index(working_dir, namespace, max(args.queries, 50)):
+                    print(f"  {name:<8} {query_ms:>7.2f} ms  recall@20 {recall:.3f}")
+            return
+        print(f"{'store':<16} {'format':<6} {'vectors':>8} {'load ms':>9} {'RSS load MB':>12} {'RSS query MB':>13} {'query ms':>9}")
+        for namespace in namespaces:
+            for kind in ("json", "mmap"):
+                r = measure(kind, working_dir, namespace, args.queries)
+                print(f"{namespace:<16} {kind:<6} {r['vectors']:>8} {r['load_ms']:>9.1f} {r['rss_load_mb']:>12.1f} "
+                      f"{r['rss_query_mb']:>13.1f} {r['query_ms']:>9.2f}")
+    finally:
+        if tmp:
+            shutil.rmtree(tmp)
+
+if __name__ == "__main__":
+    main()
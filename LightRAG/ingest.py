@@ -0,0 +1,166 @@
+"""
+Incremental ingestion of a directory of text files into LightRAG.
+
+Only new and changed files are read and inserted:
+
+- a file whose size and modification time match ``ingest_manifest.json`` (in the working
+  directory) and whose document is processed is skipped without being read;
+- otherwise its content hash is compared with the one in the doc-status store: unchanged
+  documents are skipped; changed ones, and failed or interrupted ones, are deleted from the
+  graph and inserted again;
+- a file LightRAG refused as a copy of another document (same content or same file name) is
+  recorded as such in the manifest and not sent again until it changes;
+- documents are inserted in batches of at most `batch_size` files and `batch_chars`
+  characters, while the next files are read; reading waits when a batch is full, so at most
+  about two batches of text are held in memory.
+
+    report = await ingest_directory(rag, "../../knowledge_extraction/txt/raw")
+    await watch_directory(rag, "../../knowledge_extraction/txt/raw", interval=300)
+
+Documents are identified by their file path, so a file moved to another path is a new document.
+"""
+import os
+import json
+import time
+import asyncio
+from pathlib import Path
+
+from lightrag.base import DocStatus
+from lightrag.utils import compute_mdhash_id, logger, sanitize_text_for_encoding
+from lightrag.utils_pipeline import compute_text_content_hash
+
+MANIFEST_NAME = "ingest_manifest.json"
+
+def source_name(path):
+    """Path recorded for a file, without leading ``..`` parts (as the notebook did)."""
+    parts = Path(os.path.normpath(path)).parts
+    while parts and parts[0] == "..":
+        parts = parts[1:]
+    return "/".join(parts)
+
+def read_text(path):
+    with open(path, encoding="utf-8") as f:
+        return sanitize_text_for_encoding(f.read())
+
+class Manifest:
+    """Size, modification time and content hash of each ingested file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def unchanged(self, name, stat):
+        entry = self.entries.get(name)
+        return entry is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns
+
+    def duplicate(self, name):
+        return self.entries.get(name, {}).get("duplicate", False)
+
+    def record(self, name, stat, content_hash, duplicate=False):
+        self.entries[name] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "content_hash": content_hash}
+        if duplicate:
+            self.entries[name]["duplicate"] = True
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=1, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+def _skip(path, error, report):
+    """A file that vanished or cannot be decoded is counted and skipped; it is tried again next pass."""
+    report["errors"] += 1
+    logger.warning(f"Skipping {path}: {type(error).__name__}: {error}")
+
+async def _scan(rag, paths, manifest, queue, report):
+    """Producer: put the files to insert on `queue`, skipping unchanged ones."""
+    try:
+        for path in paths:
+            name = source_name(path)
+            doc_id = compute_mdhash_id(name, prefix="doc-")
+            try:
+                stat = os.stat(path)
+            except OSError as e:
+                _skip(path, e, report)
+                continue
+            status = await rag.doc_status.get_by_id(doc_id)
+            processed = status is not None and status.get("status") == DocStatus.PROCESSED
+            if manifest.unchanged(name, stat) and (processed or status is None and manifest.duplicate(name)):
+                report["duplicates" if status is None else "unchanged"] += 1
+                continue
+            try:
+                text = await asyncio.to_thread(read_text, path)
+            except (OSError, UnicodeDecodeError) as e:
+                _skip(path, e, report)
+                continue
+            content_hash = compute_text_content_hash(text)
+            same = status is not None and status.get("content_hash") == content_hash
+            if same and processed:
+                report["unchanged"] += 1
+                manifest.record(name, stat, content_hash)
+                continue
+            kind = "retried" if same else "changed" if status is not None else "new"
+            report[kind] += 1
+            await queue.put({"id": doc_id, "name": name, "text": text, "stat": stat, "kind": kind,
+                             "content_hash": content_hash})
+    finally:
+        await queue.put(None)
+
+async def _insert(rag, manifest, batch, report):
+    for doc in batch:
+        if doc["kind"] != "new":
+            await rag.adelete_by_doc_id(doc["id"])
+    start = time.perf_counter()
+    await rag.ainsert([doc["text"] for doc in batch], ids=[doc["id"] for doc in batch],
+                      file_paths=[doc["name"] for doc in batch])
+    # A copy of another document is stored under a separate "dup-" record, not under its id
+    stored = await rag.doc_status.get_by_ids([doc["id"] for doc in batch])
+    for doc, status in zip(batch, stored):
+        manifest.record(doc["name"], doc["stat"], doc["content_hash"], duplicate=status is None)
+        if status is None:
+            report[doc["kind"]] -= 1
+            report["duplicates"] += 1
+    manifest.save()
+    report["batches"] += 1
+    logger.info(f"Ingested {len(batch)} documents ({sum(len(doc['text']) for doc in batch)} characters) "
+                f"in {time.perf_counter() - start:.1f}s")
+
+async def ingest_directory(rag, directory, pattern="*.txt", batch_size=8, batch_chars=2_000_000):
+    """Insert the new and changed files of `directory` matching `pattern`; returns counts."""
+    report = {"files": 0, "unchanged": 0, "duplicates": 0, "new": 0, "changed": 0, "retried": 0, "errors": 0,
+              "batches": 0}
+    start = time.perf_counter()
+    paths = sorted(str(path) for path in Path(directory).glob(pattern) if path.is_file())
+    report["files"] = len(paths)
+    manifest = Manifest(os.path.join(rag.working_dir, MANIFEST_NAME))
+    queue = asyncio.Queue(maxsize=batch_size)
+    scanner = asyncio.create_task(_scan(rag, paths, manifest, queue, report))
+    try:
+        batch = []
+        while (doc := await queue.get()) is not None:
+            if batch and (len(batch) == batch_size or sum(len(d["text"]) for d in batch) + len(doc["text"]) > batch_chars):
+                await _insert(rag, manifest, batch, report)
+                batch = []
+            batch.append(doc)
+        if batch:
+            await _insert(rag, manifest, batch, report)
+        await scanner
+    finally:
+        scanner.cancel()
+    manifest.save()
+    report["seconds"] = round(time.perf_counter() - start, 1)
+    logger.info(f"Ingestion of {directory}: " + ", ".join(f"{key} {value}" for key, value in report.items()))
+    return report
+
+async def watch_directory(rag, directory, interval=300, **options):
+    """Ingest `directory` now and then every `interval` seconds, until cancelled."""
+    while True:
+        try:
+            await ingest_directory(rag, directory, **options)
+        except Exception as e:
+            # A failed pass (storage or LLM error) is retried at the next interval
+            logger.error(f"Ingestion of {directory} failed: {type(e).__name__}: {e}")
+        await asyncio.sleep(interval)
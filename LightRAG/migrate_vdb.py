@@ -0,0 +1,43 @@
+"""
+Convert the NanoVectorDB JSON stores of a LightRAG working directory to MmapVectorDBStorage.
+
+    python migrate_vdb.py rag_storage                    # float32 vectors, JSON files kept
+    python migrate_vdb.py rag_storage --dtype float16 --remove-json
+
+Then create the LightRAG instance with ``vector_storage="MmapVectorDBStorage"``.
+"""
+import os
+import glob
+import argparse
+
+from mmap_vector_storage import VECTOR_DTYPES, migrate_nano_json
+
+def migrate(working_dir, dtype="float32", remove_json=False):
+    migrated = {}
+    for json_path in sorted(glob.glob(os.path.join(working_dir, "vdb_*.json"))):
+        namespace = os.path.basename(json_path)[len("vdb_"):-len(".json")]
+        index_path = os.path.join(working_dir, f"vdb_{namespace}.index.jsonl")
+        if os.path.exists(index_path):
+            print(f"{namespace}: {index_path} already exists, skipped")
+            continue
+        store = migrate_nano_json(json_path, working_dir, namespace, dtype)
+        size = os.path.getsize(store.vectors_path) + os.path.getsize(store.index_path)
+        print(f"{namespace}: {len(store.records)} vectors, "
+              f"{os.path.getsize(json_path) / 1024:.0f} KiB of JSON -> {size / 1024:.0f} KiB")
+        if remove_json:
+            os.remove(json_path)
+        migrated[namespace] = len(store.records)
+    return migrated
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert LightRAG vdb_*.json stores to memory-mapped vector files.")
+    parser.add_argument("working_dir", help="LightRAG working directory (e.g. rag_storage)")
+    parser.add_argument("--dtype", default="float32", choices=VECTOR_DTYPES,
+                        help="float16 halves the size, with about 3 significant digits per component")
+    parser.add_argument("--remove-json", action="store_true", help="Delete each JSON store once converted")
+    args = parser.parse_args()
+    if not migrate(args.working_dir, args.dtype, args.remove_json):
+        print("Nothing to migrate")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+"""
+Memory-mapped vector storage for LightRAG.
+
+A drop-in replacement for the JSON ``vdb_<namespace>.json`` files of NanoVectorDBStorage:
+
+    vdb_<namespace>.<generation>.vectors   normalized embeddings, one float32 (or float16) row each
+    vdb_<namespace>.index.jsonl            header line, then one line per upsert or delete
+
+Loading maps the vector file instead of parsing it, so start-up time and resident memory
+no longer grow with the number of embeddings. Upserts append to both files; rows that were
+overwritten or deleted are dropped by a compaction once they outnumber the live ones.
+
+    import mmap_vector_storage  # registers "MmapVectorDBStorage"
+    rag = LightRAG(..., vector_storage="MmapVectorDBStorage",
+                   vector_db_storage_cls_kwargs={"cosine_better_than_threshold": 0.2, "vector_dtype": "float16"})
+
+Existing stores are converted with ``python migrate_vdb.py rag_storage``. Queries go through
+an exact or IVF index, see vector_index.py.
+"""
+import os
+import json
+import time
+import base64
+import asyncio
+from dataclasses import dataclass
+from typing import Any, final
+
+import numpy as np
+
+from lightrag.base import BaseVectorStorage
+from lightrag.utils import compute_mdhash_id, logger
+
+from vector_index import IVF_MIN_ROWS, IVF_NPROBE, make_index, normalize
+
+FORMAT_VERSION = 1
+VECTOR_DTYPES = ("float32", "float16")
+# Compact once dead rows are more than this fraction of the file (and at least COMPACT_MIN_ROWS)
+COMPACT_RATIO = 0.5
+COMPACT_MIN_ROWS = 256
+
+class MmapVectorFile:
+    """The two files of one namespace: an append-only log of records and a matrix of rows.
+
+    Not safe for several writer processes; readers in other processes see the rows that
+    were appended before they loaded.
+    """
+
+    def __init__(self, directory, namespace, embedding_dim, dtype="float32"):
+        if dtype not in VECTOR_DTYPES:
+            raise ValueError(f"vector_dtype must be one of {VECTOR_DTYPES}, not {dtype!r}")
+        self.directory = directory
+        self.namespace = namespace
+        self.index_path = os.path.join(directory, f"vdb_{namespace}.index.jsonl")
+        self.embedding_dim = embedding_dim
+        self.dtype = np.dtype(dtype)
+        self.generation = 0
+        self.records = {}  # id -> {"row": int, "created_at": float, "meta": dict}
+        self.rows = 0  # rows in the vector file, live or not
+        self.live = np.zeros(0, dtype=bool)
+        self.row_ids = []
+        self._matrix = None
+        self._load()
+
+    @property
+    def vectors_path(self):
+        return os.path.join(self.directory, f"vdb_{self.namespace}.{self.generation}.vectors")
+
+    @property
+    def dead_rows(self):
+        return self.rows - len(self.records)
+
+    def _header(self):
+        return {
+            "format": "mmap-vdb", "version": FORMAT_VERSION, "embedding_dim": self.embedding_dim,
+            "dtype": self.dtype.name, "generation": self.generation,
+        }
+
+    def _load(self):
+        if not os.path.exists(self.index_path):
+            self._write_index([])
+            open(self.vectors_path, "wb").close()
+            return
+        with open(self.index_path, encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if header.get("format") != "mmap-vdb" or header.get("version") != FORMAT_VERSION:
+                raise ValueError(f"{self.index_path} is not a version {FORMAT_VERSION} mmap vector index")
+            if header["embedding_dim"] != self.embedding_dim:
+                raise ValueError(
+                    f"{self.index_path} holds {header['embedding_dim']}-dim vectors, "
+                    f"the embedding function returns {self.embedding_dim}"
+                )
+            self.dtype = np.dtype(header["dtype"])
+            self.generation = header["generation"]
+            row_bytes = self.embedding_dim * self.dtype.itemsize
+            self.rows, torn = divmod(os.path.getsize(self.vectors_path), row_bytes)
+            if torn:
+                # A crash cut the last append mid-row; later rows must stay aligned
+                with open(self.vectors_path, "rb+") as vectors:
+                    vectors.truncate(self.rows * row_bytes)
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # last line cut by a crash: its record was never acknowledged
+                if "delete" in entry:
+                    self.records.pop(entry["delete"], None)
+                elif entry["row"] < self.rows:
+                    self.records[entry["id"]] = {"row": entry["row"], "created_at": entry["created_at"], "meta": entry["meta"]}
+        self._rebuild_rows()
+        self._remove_old_generations()
+
+    def _rebuild_rows(self):
+        self.live = np.zeros(self.rows, dtype=bool)
+        self.row_ids = [None] * self.rows
+        for record_id, record in self.records.items():
+            self.live[record["row"]] = True
+            self.row_ids[record["row"]] = record_id
+        self._matrix = None
+
+    def _write_index(self, entries):
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps(self._header()) + "\n")
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.index_path)
+
+    def matrix(self):
+        """All rows of the vector file, memory-mapped (remapped after appends)."""
+        if self._matrix is None or len(self._matrix) != self.rows:
+            if self.rows == 0:
+                self._matrix = np.zeros((0, self.embedding_dim), dtype=self.dtype)
+            else:
+                self._matrix = np.memmap(self.vectors_path, dtype=self.dtype, mode="r", shape=(self.rows, self.embedding_dim))
+        return self._matrix
+
+    def vector(self, record_id):
+        record = self.records.get(record_id)
+        return None if record is None else np.asarray(self.matrix()[record["row"]], dtype=np.float32)
+
+    def append(self, items):
+        """Append ``(id, meta, vector)`` items; an existing id points to its new row afterwards."""
+        if not items:
+            return
+        vectors = normalize([vector for _, _, vector in items]).astype(self.dtype)
+        # Vectors first: a log line is only written once the row it points to exists
+        with open(self.vectors_path, "ab") as f:
+            f.write(vectors.tobytes())
+        now = time.time()
+        entries = []
+        self.live = np.concatenate([self.live, np.zeros(len(items), dtype=bool)])
+        self.row_ids.extend([None] * len(items))
+        for offset, (record_id, meta, _) in enumerate(items):
+            row = self.rows + offset
+            previous = self.records.get(record_id)
+            if previous is not None:
+                self.live[previous["row"]] = False
+                self.row_ids[previous["row"]] = None
+            self.records[record_id] = {"row": row, "created_at": now, "meta": meta}
+            self.live[row] = True
+            self.row_ids[row] = record_id
+            entries.append({"row": row, "id": record_id, "created_at": now, "meta": meta})
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries))
+        self.rows += len(items)
+
+    def delete(self, ids):
+        removed = []
+        for record_id in ids:
+            record = self.records.pop(record_id, None)
+            if record is not None:
+                self.live[record["row"]] = False
+                self.row_ids[record["row"]] = None
+                removed.append(record_id)
+        if removed:
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps({"delete": record_id}) + "\n" for record_id in removed))
+        return removed
+
+    def scores(self, query, chunk_rows=2048):
+        """Cosine similarity of ``query`` with every row (-inf for dead rows)."""
+        query = normalize(query)
+        matrix = self.matrix()
+        if self.dtype == np.float32:
+            scores = matrix @ query
+        else:
+            # No BLAS kernel for float16: widen a block of rows at a time
+            scores = np.concatenate([
+                np.asarray(matrix[i:i + chunk_rows], dtype=np.float32) @ query for i in range(0, self.rows, chunk_rows)
+            ]) if self.rows else np.zeros(0, dtype=np.float32)
+        return np.where(self.live, scores, -np.inf)
+
+    def needs_compaction(self):
+        return self.dead_rows >= COMPACT_MIN_ROWS and self.dead_rows > self.rows * COMPACT_RATIO
+
+    def compact(self):
+        """Rewrite the live rows to the next generation's vector file, then switch the index to it.
+
+        Returns the previous row of each new row.
+        """
+        matrix = self.matrix()
+        ordered = sorted(self.records.items(), key=lambda item: item[1]["row"])
+        old_rows = np.array([record["row"] for _, record in ordered], dtype=np.int64)
+        self.generation += 1
+        with open(self.vectors_path, "wb") as f:
+            for record_id, record in ordered:
+                f.write(np.asarray(matrix[record["row"]]).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        # Windows cannot remove a file that is still mapped
+        del matrix
+        self._matrix = None
+        entries = []
+        for row, (record_id, record) in enumerate(ordered):
+            record["row"] = row
+            entries.append({"row": row, "id": record_id, "created_at": record["created_at"], "meta": record["meta"]})
+        # The index names its vector file, so replacing it is the commit point
+        self._write_index(entries)
+        self.rows = len(ordered)
+        self._rebuild_rows()
+        self._remove_old_generations()
+        return old_rows
+
+    def _remove_old_generations(self):
+        """Delete the vector files of earlier generations; one still mapped elsewhere is left for the next load."""
+        prefix = f"vdb_{self.namespace}."
+        for name in os.listdir(self.directory):
+            generation = name[len(prefix):-len(".vectors")]
+            if name.startswith(prefix) and name.endswith(".vectors") and generation.isdigit() \
+                    and int(generation) != self.generation:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except PermissionError:
+                    logger.debug(f"{name} is still mapped, it will be removed at the next load")
+
+    def flush(self):
+        for path in (self.vectors_path, self.index_path):
+            with open(path, "rb+") as f:
+                os.fsync(f.fileno())
+
+    def remove_files(self):
+        self._matrix = None
+        for path in (self.vectors_path, self.index_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+def migrate_nano_json(json_path, directory, namespace, dtype="float32"):
+    """Convert a NanoVectorDB ``vdb_<namespace>.json`` file to an MmapVectorFile, which is returned."""
+    with open(json_path, encoding="utf-8") as f:
+        data = json.load(f)
+    embedding_dim = data["embedding_dim"]
+    matrix = np.frombuffer(base64.b64decode(data["matrix"]), dtype=np.float32).reshape(-1, embedding_dim) \
+        if data["matrix"] else np.zeros((0, embedding_dim), dtype=np.float32)
+    store = MmapVectorFile(directory, namespace, embedding_dim, dtype)
+    if store.records:
+        raise ValueError(f"{store.index_path} already holds records")
+    items = []
+    for record, vector in zip(data["data"], matrix):
+        meta = {key: value for key, value in record.items() if key not in ("__id__", "__created_at__", "__vector__")}
+        items.append((record["__id__"], meta, vector))
+    store.append(items)
+    # Keep the original creation times
+    created = {record["__id__"]: float(record.get("__created_at__", 0) or 0) for record in data["data"]}
+    for record_id, record in store.records.items():
+        record["created_at"] = created.get(record_id, record["created_at"])
+    store.compact()
+    store.flush()
+    return store
+
+@final
+@dataclass
+class MmapVectorDBStorage(BaseVectorStorage):
+    """LightRAG vector storage on an MmapVectorFile (see the module docstring)."""
+
+    def __post_init__(self):
+        self._validate_embedding_func()
+        kwargs = self.global_config.get("vector_db_storage_cls_kwargs", {})
+        threshold = kwargs.get("cosine_better_than_threshold")
+        if threshold is None:
+            raise ValueError("cosine_better_than_threshold must be specified in vector_db_storage_cls_kwargs")
+        self.cosine_better_than_threshold = threshold
+        directory = self.global_config["working_dir"]
+        if self.workspace:
+            directory = os.path.join(directory, self.workspace)
+        os.makedirs(directory, exist_ok=True)
+        self._max_batch_size = self.global_config["embedding_batch_num"]
+        self._store = MmapVectorFile(
+            directory, self.namespace, self.embedding_func.embedding_dim, kwargs.get("vector_dtype", "float32")
+        )
+        self._index_options = {
+            "kind": kwargs.get("vector_index", "auto"), "nprobe": kwargs.get("ivf_nprobe", IVF_NPROBE),
+            "nlist": kwargs.get("ivf_nlist"), "min_rows": kwargs.get("ivf_min_rows", IVF_MIN_ROWS),
+        }
+        self._index = make_index(self._store, **self._index_options)
+        self._maintain_index()
+        self._lock = asyncio.Lock()
+
+    def _maintain_index(self):
+        if self._index.maintain():
+            logger.info(f"[{self.workspace}] Trained the {self._index.kind} index of {self.namespace} "
+                        f"on {len(self._store.records)} vectors")
+        self._index.save()
+
+    async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
+        if not data:
+            return
+        ids = list(data)
+        contents = [data[record_id]["content"] for record_id in ids]
+        batches = [contents[i:i + self._max_batch_size] for i in range(0, len(contents), self._max_batch_size)]
+        embeddings = np.concatenate(await asyncio.gather(*(self.embedding_func(batch) for batch in batches)))
+        if len(embeddings) != len(ids):
+            raise ValueError(f"Embedding returned {len(embeddings)} vectors for {len(ids)} records")
+        items = [
+            (record_id, {key: value for key, value in data[record_id].items() if key in self.meta_fields}, vector)
+            for record_id, vector in zip(ids, embeddings)
+        ]
+        async with self._lock:
+            first_row = self._store.rows
+            self._store.append(items)
+            self._index.add(first_row)
+
+    async def query(self, query: str, top_k: int, query_embedding: list[float] = None) -> list[dict[str, Any]]:
+        if query_embedding is None:
+            query_embedding = (await self.embedding_func([query], context="query"))[0]
+        if not self._store.records:
+            return []
+        rows, scores = self._index.search(query_embedding, min(top_k, len(self._store.records)))
+        results = []
+        for row, score in zip(rows, scores):
+            if score < self.cosine_better_than_threshold:
+                break
+            results.append({**self._format(self._store.row_ids[row]), "distance": float(score)})
+        return results
+
+    def _format(self, record_id):
+        record = self._store.records[record_id]
+        return {**record["meta"], "__id__": record_id, "__created_at__": record["created_at"],
+                "id": record_id, "created_at": record["created_at"]}
+
+    async def get_by_id(self, id: str) -> dict[str, Any] | None:
+        return self._format(id) if id in self._store.records else None
+
+    async def get_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
+        return [self._format(record_id) for record_id in ids if record_id in self._store.records]
+
+    async def get_vectors_by_ids(self, ids: list[str]) -> dict[str, list[float]]:
+        return {record_id: self._store.vector(record_id).tolist() for record_id in ids if record_id in self._store.records}
+
+    async def delete(self, ids: list[str]):
+        async with self._lock:
+            removed = self._store.delete(ids)
+        logger.debug(f"[{self.workspace}] Deleted {len(removed)} vectors from {self.namespace}")
+
+    async def delete_entity(self, entity_name: str) -> None:
+        await self.delete([compute_mdhash_id(entity_name, prefix="ent-")])
+
+    async def delete_entity_relation(self, entity_name: str) -> None:
+        ids = [
+            record_id for record_id, record in self._store.records.items()
+            if entity_name in (record["meta"].get("src_id"), record["meta"].get("tgt_id"))
+        ]
+        await self.delete(ids)
+
+    async def index_done_callback(self) -> bool:
+        async with self._lock:
+            if self._store.needs_compaction():
+                logger.info(f"[{self.workspace}] Compacting {self.namespace}: {self._store.dead_rows} dead rows")
+                self._index.remap(self._store.compact())
+            else:
+                self._store.flush()
+            self._maintain_index()
+        return True
+
+    async def drop(self) -> dict[str, str]:
+        try:
+            async with self._lock:
+                self._store.remove_files()
+                self._index.remove_files()
+                self._store = MmapVectorFile(
+                    self._store.directory, self.namespace, self.embedding_func.embedding_dim, self._store.dtype.name
+                )
+                self._index = make_index(self._store, **self._index_options)
+            return {"status": "success", "message": "data dropped"}
+        except Exception as e:
+            logger.error(f"[{self.workspace}] Error dropping {self.namespace}: {e}")
+            return {"status": "error", "message": str(e)}
+
+def register():
+    """Make ``vector_storage="MmapVectorDBStorage"`` resolvable by LightRAG."""
+    from lightrag import kg
+    kg.STORAGES.setdefault("MmapVectorDBStorage", __name__)
+    implementations = kg.STORAGE_IMPLEMENTATIONS["VECTOR_STORAGE"]["implementations"]
+    if "MmapVectorDBStorage" not in implementations:
+        implementations.append("MmapVectorDBStorage")
+    kg.STORAGE_ENV_REQUIREMENTS.setdefault("MmapVectorDBStorage", [])
+
+register()
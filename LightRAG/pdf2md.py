@@ -0,0 +1,723 @@
+"""
+PDF to Markdown conversion with a vision model (Mistral API or a local Ollama server).
+
+Pages are rendered to compact images, at the resolution the model uses, in a process
+pool while the model calls run concurrently on one shared client, under a rate limit.
+Each finished page is written to the output file in page order as soon as it is done,
+and checkpointed next to it, so a rerun after a crash only converts the missing pages.
+
+    python pdf2md.py pdf/ --out md/ --model mistral-small-latest
+    python pdf2md.py pdf/ --out md/ --backend ollama --model gemma3:4b --concurrency 1
+"""
+import os
+import re
+import sys
+import json
+import time
+import base64
+import asyncio
+import hashlib
+import argparse
+import threading
+import concurrent.futures
+from io import BytesIO
+from pathlib import Path
+
+import fitz  # PyMuPDF
+from PIL import Image
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY")
+OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+CACHE_DIR = os.getenv("PDF2MD_CACHE_DIR", ".pdf2md_cache")
+CACHE_MAX_MB = int(os.getenv("PDF2MD_CACHE_MAX_MB", "512"))
+
+FRENCH_PROMPT = """
+Vous êtes un modèle linguistique avancé. Votre tâche consiste à lire une page PDF qui a été rendue sous forme d'image. L'objectif est de transformer le contenu de cette image en format Markdown. Étant donné que Markdown est uniquement textuel, vous devrez également décrire toutes les images trouvées dans la page PDF sous forme de texte. Le PDF contient des informations géographiques, donc assurez-vous que les détails géographiques sont capturés et formatés avec précision.
+
+Instructions spécifiques :
+
+    Extraire le texte : Identifiez et extrayez tout le contenu textuel de l'image, en prêtant une attention particulière aux termes géographiques et aux détails spécifiques à la géographie.
+    Convertir en Markdown : Formatez le texte extrait en utilisant la syntaxe Markdown, en veillant à ce que les titres, sous-titres, listes et autres formats pertinents soient correctement utilisés.
+    Décrire et interpréter les images : Pour chaque image trouvée dans le PDF, rédigez un texte descriptif qui transmet le contenu et le contexte de l'image. Si l'image est une carte, essayez d'interpréter ce que la carte veut dire et le message qu'elle souhaite faire passer, en vous concentrant sur les éléments clés tels que les légendes, les symboles et les zones géographiques représentées.
+
+Exemple :
+
+Si la page PDF contient un titre, un paragraphe et une image décrivant une carte des zones climatiques, votre sortie devrait ressembler à ceci :
+
+```markdown
+# Carte des Zones Climatiques
+
+Ceci est un paragraphe extrait de la page PDF. Il contient des informations sur les différentes zones climatiques de la région étudiée.
+
+## Zones Climatiques
+
+- Zone tropicale
+- Zone tempérée
+- Zone polaire
+
+![Description de la carte : Cette image illustre les différentes zones climatiques de la région. Les zones sont colorées pour indiquer les variations de température et de précipitations. La légende montre que la zone tropicale est caractérisée par des températures élevées et des précipitations abondantes, tandis que la zone polaire est marquée par des températures très basses et des précipitations faibles. Cette carte met en évidence l'impact du climat sur la biodiversité et l'habitat humain dans chaque zone.]
+```
+
+"""
+
+# --- Page Rendering ---
+
+# Longest image side each backend's model works at; larger images are downscaled on its side
+MAX_IMAGE_SIDE = {"mistral": 1540, "ollama": 1024}
+IMAGE_FORMATS = {"jpeg": "image/jpeg", "webp": "image/webp", "png": "image/png"}
+JPEG_QUALITY = 85
+# A page is sent as text when its text layer has this many characters and it holds no picture
+MIN_TEXT_CHARS = 200
+MAX_TEXT_PAGE_DRAWINGS = 20
+
+def page_clip(page, remove_header=False, remove_footer=False, header_height=390, footer_height=140):
+    """Page area left after removing the header/footer; heights are in pixels at 300 DPI, as before."""
+    rect = page.rect
+    top = rect.y0 + (header_height * 72 / 300 if remove_header else 0)
+    bottom = rect.y1 - (footer_height * 72 / 300 if remove_footer else 0)
+    return fitz.Rect(rect.x0, top, rect.x1, max(top + 1, bottom))
+
+def encode_pixmap(pix, image_format):
+    if image_format == "png":
+        return pix.tobytes("png")
+    # Pillow's JPEG/WebP encoders are several times faster than MuPDF's own JPEG writer
+    img = Image.frombuffer("RGB", (pix.width, pix.height), pix.samples_mv, "raw", "RGB", pix.stride, 1)
+    buffered = BytesIO()
+    if image_format == "jpeg":
+        img.save(buffered, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    else:
+        img.save(buffered, format="WEBP", quality=80, method=2)
+    return buffered.getvalue()
+
+def convert_page_to_image64(page, remove_header=False, remove_footer=False, header_height=390, footer_height=140,
+                            dpi=300, image_format="png"):
+    clip = page_clip(page, remove_header, remove_footer, header_height, footer_height)
+    pix = page.get_pixmap(dpi=dpi, clip=clip, alpha=False)
+    return base64.b64encode(encode_pixmap(pix, image_format)).decode("utf-8")
+
+def extractable_text(page, clip):
+    """The page's text layer, when it holds the whole page content (no picture, few vector drawings)."""
+    if page.get_images(full=False) or len(page.get_drawings()) > MAX_TEXT_PAGE_DRAWINGS:
+        return None
+    text = page.get_text("text", clip=clip, sort=True).strip()
+    return text if len(text) >= MIN_TEXT_CHARS else None
+
+def render_page(page, crop, max_side=MAX_IMAGE_SIDE["mistral"], image_format="jpeg", text_layer=False):
+    """Render only the clip rectangle, at the DPI that gives the model ``max_side`` pixels (at most 300).
+
+    Returns a dict with the base64 image (or the text layer, ``kind == "text"``) and its timings.
+    """
+    start = time.perf_counter()
+    clip = page_clip(page, **crop)
+    if text_layer:
+        text = extractable_text(page, clip)
+        if text is not None:
+            return {"kind": "text", "data": text, "mime": "text/plain", "dpi": 0, "width": 0, "height": 0,
+                    "render_ms": (time.perf_counter() - start) * 1000, "encode_ms": 0.0, "bytes": len(text.encode("utf-8"))}
+    zoom = min(300 / 72, max_side / max(clip.width, clip.height))
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip, alpha=False)
+    rendered = time.perf_counter()
+    data = encode_pixmap(pix, image_format)
+    return {
+        "kind": "image", "data": base64.b64encode(data).decode("utf-8"), "mime": IMAGE_FORMATS[image_format],
+        "dpi": round(zoom * 72), "width": pix.width, "height": pix.height,
+        "render_ms": (rendered - start) * 1000, "encode_ms": (time.perf_counter() - rendered) * 1000,
+        "bytes": len(data),
+    }
+
+# Document last opened by this (worker) process, so consecutive pages of a PDF do not reparse it.
+# PDFs are converted one after another, so only the current one is kept open.
+_open_doc = {"path": None, "doc": None}
+
+def _render_page(pdf_filepath, page_num, crop, max_side, image_format, text_layer):
+    if _open_doc["path"] != pdf_filepath:
+        if _open_doc["doc"] is not None:
+            _open_doc["doc"].close()
+            _open_doc["doc"] = _open_doc["path"] = None
+        _open_doc["doc"], _open_doc["path"] = fitz.open(pdf_filepath), pdf_filepath
+    return render_page(_open_doc["doc"].load_page(page_num), crop, max_side, image_format, text_layer)
+
+# --- Backends ---
+
+class MistralBackend:
+    """One Mistral client (and its connection pool) shared by all pages."""
+
+    name = "mistral"
+
+    def __init__(self, model, api_key=None):
+        from mistralai import Mistral
+        self.model = model
+        self.client = Mistral(api_key=api_key or MISTRAL_API_KEY)
+
+    @staticmethod
+    def _messages(prompt, img_base64, mime):
+        content = [{"type": "text", "text": prompt}]
+        if img_base64 is not None:
+            content.append({"type": "image_url", "image_url": {"url": f"data:{mime};base64,{img_base64}"}})
+        return [{"role": "user", "content": content}]
+
+    async def complete(self, prompt, img_base64=None, mime="image/png"):
+        messages = self._messages(prompt, img_base64, mime)
+        response = await self.client.chat.complete_async(model=self.model, messages=messages, temperature=0.0)
+        return response.choices[0].message.content
+
+    async def stream(self, prompt, img_base64=None, mime="image/png"):
+        messages = self._messages(prompt, img_base64, mime)
+        response = await self.client.chat.stream_async(model=self.model, messages=messages, temperature=0.0)
+        async for event in response:
+            content = event.data.choices[0].delta.content
+            if isinstance(content, str) and content:
+                yield content
+
+class OllamaBackend:
+    name = "ollama"
+
+    def __init__(self, model, host=None):
+        import ollama
+        self.model = model
+        self.client = ollama.AsyncClient(host=host or OLLAMA_HOST)
+
+    @staticmethod
+    def _messages(prompt, img_base64):
+        message = {"role": "user", "content": prompt}
+        if img_base64 is not None:
+            message["images"] = [img_base64]
+        return [message]
+
+    async def complete(self, prompt, img_base64=None, mime="image/png"):
+        response = await self.client.chat(model=self.model, messages=self._messages(prompt, img_base64))
+        return response["message"]["content"]
+
+    async def stream(self, prompt, img_base64=None, mime="image/png"):
+        async for chunk in await self.client.chat(model=self.model, messages=self._messages(prompt, img_base64), stream=True):
+            if chunk["message"]["content"]:
+                yield chunk["message"]["content"]
+
+def make_backend(model, api=True):
+    return MistralBackend(model) if api else OllamaBackend(model)
+
+# --- Rate Limiting ---
+
+class RateLimiter:
+    """Spaces request starts at least 1 / max_per_second apart (0 disables the limit)."""
+
+    def __init__(self, max_per_second):
+        self.interval = 1 / max_per_second if max_per_second > 0 else 0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+            self._next = max(now, self._next) + self.interval
+
+# --- Checkpoints ---
+
+def clean_markdown(content):
+    # Keep only the body of a ```markdown fence when the model wraps its answer in one
+    match = re.search(r"```markdown(.*?)```", content, re.DOTALL)
+    return match.group(1).strip() if match else content.strip()
+
+def output_filepath(markdown_filepath, model):
+    return markdown_filepath.replace(".md", "___" + model + "___.md")
+
+class PageCheckpoints:
+    """One JSON file per finished page in ``<output>.pages/``.
+
+    The directory records the settings its pages were produced with; checkpoints from a
+    run with another prompt, model or crop are discarded.
+    """
+
+    def __init__(self, output_path, settings):
+        self.directory = Path(output_path).with_suffix(".pages")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fingerprint = hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()
+        manifest = self.directory / "manifest.json"
+        previous = json.loads(manifest.read_text(encoding="utf-8")) if manifest.exists() else {}
+        if previous.get("fingerprint") != self.fingerprint:
+            for stale in self.directory.glob("page-*.json"):
+                stale.unlink()
+            manifest.write_text(json.dumps({"fingerprint": self.fingerprint}), encoding="utf-8")
+
+    def _path(self, page_num):
+        return self.directory / f"page-{page_num + 1:04d}.json"
+
+    def load(self, page_num):
+        path = self._path(page_num)
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))["markdown"]
+
+    def save(self, page_num, markdown, stats=None):
+        path = self._path(page_num)
+        tmp = path.with_suffix(".tmp")
+        record = {"page": page_num + 1, "markdown": markdown, "stats": stats or {}}
+        tmp.write_text(json.dumps(record, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)  # atomic: a crash never leaves a truncated checkpoint
+
+# --- Streaming Output ---
+
+def context_tail(markdown, max_chars):
+    """The end of a page's Markdown, at most ``max_chars``, as context for the next page.
+
+    The tail starts on a line boundary and is preceded by the last heading it falls under.
+    """
+    text = clean_markdown(markdown)
+    if len(text) <= max_chars:
+        return text
+    cut = len(text) - max_chars
+    newline = text.find("\n", cut)
+    if newline != -1:
+        cut = newline + 1
+    headings = [line for line in text[:cut].splitlines() if line.startswith("#")]
+    return (f"{headings[-1]}\n[...]\n" if headings else "[...]\n") + text[cut:]
+
+class FenceFilter:
+    """Incremental clean_markdown(): drops a leading ```markdown line and everything from its closing fence."""
+
+    def __init__(self):
+        self._line = ""
+        self._started = False
+        self._fenced = False
+        self._closed = False
+
+    def _filter_line(self, line):
+        if self._closed:
+            return ""
+        if not self._started:
+            if not line.strip():
+                return ""
+            self._started = True
+            if line.strip() == "```markdown":
+                self._fenced = True
+                return ""
+            return line.lstrip()
+        elif self._fenced and line.strip() == "```":
+            self._closed = True
+            return ""
+        return line
+
+    def feed(self, chunk):
+        lines = (self._line + chunk).split("\n")
+        self._line = lines.pop()
+        return "".join(self._filter_line(line + "\n") for line in lines)
+
+    def flush(self):
+        tail, self._line = self._filter_line(self._line), ""
+        return tail
+
+class MarkdownStream:
+    """Writes the pages of one document to its output file in page order, as soon as they arrive.
+
+    Pages finishing ahead of the next one wait in a reorder buffer. Streamed tokens of the
+    next page go straight to the file, so it can be followed while the model writes.
+    """
+
+    def __init__(self, path, page_count):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "w", encoding="utf-8")
+        self._page_count = page_count
+        self._next = 0
+        self._pages = {}
+        self._head_offset = 0  # where the next page starts in the file
+        self._whitespace = ""  # trailing whitespace of the next page, written only if text follows
+
+    def _page(self, page_num):
+        return self._pages.setdefault(page_num, {"filter": FenceFilter(), "buffer": [], "streamed": [], "done": False})
+
+    def _write(self, text):
+        text = self._whitespace + text
+        body = text.rstrip()
+        self._whitespace = text[len(body):]
+        if body:
+            self._file.write(body)
+            self._file.flush()
+
+    def _advance(self):
+        while self._next in self._pages:
+            page = self._pages[self._next]
+            self._write("".join(page["buffer"]))
+            page["buffer"].clear()
+            if not page["done"]:
+                return
+            del self._pages[self._next]
+            self._next += 1
+            self._whitespace = ""
+            if self._next < self._page_count:
+                self._file.write("\n\n")
+            self._file.flush()
+            self._head_offset = self._file.tell()
+
+    def feed(self, page_num, chunk):
+        """Add streamed tokens of a page."""
+        page = self._page(page_num)
+        text = page["filter"].feed(chunk)
+        page["buffer"].append(text)
+        page["streamed"].append(text)
+        if page_num == self._next:
+            self._advance()
+
+    def discard(self, page_num):
+        """Forget the tokens of a page whose stream failed, before it is retried."""
+        self._pages.pop(page_num, None)
+        if page_num == self._next:
+            self._file.seek(self._head_offset)
+            self._file.truncate()
+            self._whitespace = ""
+
+    def finish(self, page_num, markdown, streamed=False):
+        """Mark a page complete with its whole answer, which was already fed token by token if ``streamed``."""
+        cleaned = clean_markdown(markdown)
+        page = self._pages.get(page_num)
+        if streamed and page is not None:
+            text = page["filter"].flush()
+            page["buffer"].append(text)
+            page["streamed"].append(text)
+            # The filter only strips a fence opening the answer; anything else is rewritten whole
+            if "".join(page["streamed"]).strip() != cleaned:
+                page = None
+        if page is None or not streamed:
+            self.discard(page_num)
+            page = self._page(page_num)
+            page["buffer"].append(cleaned)
+        page["done"] = True
+        self._advance()
+
+    def close(self):
+        self._file.close()
+
+# --- Response Cache ---
+
+class PageCache:
+    """On-disk model answers keyed by hash of (model, full prompt, page image or text).
+
+    The full prompt includes the previous-page context, so a page is only sent again when
+    something that reaches the model changed. Any backend can share the directory; the
+    least recently used answers are evicted once it holds more than ``max_mb``.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_mb=CACHE_MAX_MB):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_mb * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self._size = sum(path.stat().st_size for path in self.directory.glob("*/*.json"))
+
+    @staticmethod
+    def key(model, prompt, page):
+        digest = hashlib.sha256()
+        for part in (model, prompt, page["mime"], page["data"]):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            markdown = json.loads(path.read_text(encoding="utf-8"))["markdown"]
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        os.utime(path)  # the modification time orders entries for eviction
+        self.hits += 1
+        return markdown
+
+    def put(self, key, markdown, model):
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"model": model, "markdown": markdown}, ensure_ascii=False), encoding="utf-8")
+        previous = path.stat().st_size if path.exists() else 0
+        os.replace(tmp, path)
+        self._size += path.stat().st_size - previous
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        entries = sorted(
+            ((entry.stat().st_mtime, entry.stat().st_size, entry) for entry in self.directory.glob("*/*.json")),
+            key=lambda item: item[0],
+        )
+        self._size = sum(size for _, size, _ in entries)
+        # Evict down to 90% so a full cache does not rescan the directory on every write
+        for _, size, entry in entries:
+            if self._size <= self.max_bytes * 0.9:
+                break
+            entry.unlink(missing_ok=True)
+            self._size -= size
+
+    def clear(self):
+        for entry in self.directory.glob("*/*.json"):
+            entry.unlink(missing_ok=True)
+        self._size = 0
+
+# --- Converter ---
+
+DEFAULT_CROP = {"remove_header": True, "remove_footer": True, "header_height": 250, "footer_height": 250}
+
+class PdfConverter:
+    """Converts PDFs page by page with ``workers`` render processes and ``concurrency`` model calls.
+
+    With ``chain_context`` each prompt includes the end of the previous page's Markdown
+    (``context_chars``); the model calls of a document then run one after the other. With
+    ``text_layer``, pages whose text can be extracted are sent as text, without rendering.
+    With a ``cache`` (PageCache), answers already known are reused without a model call.
+    Pages are written to the output file in order as they complete; with ``stream``, the
+    answers of backends that can stream are written token by token.
+    """
+
+    def __init__(self, backend, prompt, workers=None, concurrency=4, max_per_second=2.0, retries=2,
+                 chain_context=False, crop=None, max_side=None, image_format="jpeg", text_layer=False, cache=None,
+                 context_chars=1500, stream=False):
+        self.backend = backend
+        self.prompt = prompt
+        self.workers = workers or os.cpu_count() or 1
+        self.concurrency = concurrency
+        self.limiter = RateLimiter(max_per_second)
+        self.retries = retries
+        self.chain_context = chain_context
+        self.crop = dict(DEFAULT_CROP if crop is None else crop)
+        self.max_side = max_side or MAX_IMAGE_SIDE.get(backend.name, MAX_IMAGE_SIDE["mistral"])
+        self.image_format = image_format
+        self.text_layer = text_layer
+        self.cache = cache
+        self.context_chars = context_chars
+        self.stream = stream and hasattr(backend, "stream")
+        self._calls = None
+        self._pool = None
+
+    def __enter__(self):
+        self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers)
+        return self
+
+    def __exit__(self, *exc):
+        self._pool.shutdown(cancel_futures=True)
+        self._pool = None
+
+    def _final_prompt(self, previous, page):
+        prompt = self.prompt
+        if previous is not None:
+            prompt = f"{prompt}\n\nLast processed page:\n{previous}\n\nThis page:\n"
+        if page["kind"] == "text":
+            prompt = f"{prompt}\n\nThe page was not rendered as an image; here is its extracted text:\n{page['data']}"
+        return prompt
+
+    async def _complete(self, prompt, img_base64, mime, page_num, writer):
+        if not self.stream:
+            return await self.backend.complete(prompt, img_base64, mime)
+        chunks = []
+        try:
+            async for chunk in self.backend.stream(prompt, img_base64, mime):
+                chunks.append(chunk)
+                writer.feed(page_num, chunk)
+        except Exception:
+            writer.discard(page_num)
+            raise
+        return "".join(chunks)
+
+    async def _call(self, prompt, page, page_num, writer):
+        """The page's Markdown, and whether it was already streamed to ``writer``."""
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(self.backend.model, prompt, page)
+            markdown = self.cache.get(key)
+            if markdown is not None:
+                return markdown, False
+        img_base64 = page["data"] if page["kind"] == "image" else None
+        for attempt in range(self.retries + 1):
+            await self.limiter.wait()
+            try:
+                async with self._calls:
+                    markdown = await self._complete(prompt, img_base64, page["mime"], page_num, writer)
+                break
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                await asyncio.sleep(2 ** attempt)
+        if key is not None:
+            self.cache.put(key, markdown, self.backend.model)
+        return markdown, self.stream
+
+    async def _convert_page(self, pdf_filepath, page_num, checkpoints, writer, tails, slots):
+        loop = asyncio.get_running_loop()
+        async with slots:
+            try:
+                page = await loop.run_in_executor(
+                    self._pool, _render_page, pdf_filepath, page_num,
+                    self.crop, self.max_side, self.image_format, self.text_layer,
+                )
+                previous = None
+                if self.chain_context and page_num > 0:
+                    previous = await tails[page_num - 1]
+                markdown, streamed = await self._call(self._final_prompt(previous, page), page, page_num, writer)
+            except Exception as e:
+                print(f"Error processing page {page_num + 1}: {e}")
+                error = f"<!-- Error on page {page_num + 1} -->"
+                writer.finish(page_num, error)
+                tails[page_num].set_result(error)
+                return None
+        page_stats = {key: value for key, value in page.items() if key != "data"}
+        checkpoints.save(page_num, markdown, page_stats)
+        writer.finish(page_num, markdown, streamed)
+        tails[page_num].set_result(context_tail(markdown, self.context_chars))
+        return page_stats
+
+    async def convert(self, pdf_filepath, markdown_filepath):
+        """Convert one PDF and write ``<markdown_filepath stem>___<model>___.md``. Returns a stats dict."""
+        if self._calls is None:
+            self._calls = asyncio.Semaphore(self.concurrency)
+        start = time.perf_counter()
+        cache_hits = self.cache.hits if self.cache is not None else 0
+        output_path = output_filepath(markdown_filepath, self.backend.model)
+        checkpoints = PageCheckpoints(output_path, {
+            "prompt": self.prompt, "model": self.backend.model, "backend": self.backend.name,
+            "crop": self.crop, "chain_context": self.chain_context,
+            "max_side": self.max_side, "image_format": self.image_format, "text_layer": self.text_layer,
+            "context_chars": self.context_chars if self.chain_context else None,
+        })
+        with fitz.open(pdf_filepath) as doc:
+            page_count = len(doc)
+
+        loop = asyncio.get_running_loop()
+        # Only the bounded context of each page is kept; the pages themselves go to the file
+        tails = [loop.create_future() for _ in range(page_count)]
+        writer = MarkdownStream(output_path, page_count)
+        try:
+            pending = []
+            for page_num in range(page_count):
+                markdown = checkpoints.load(page_num)
+                if markdown is not None:
+                    writer.finish(page_num, markdown)
+                    tails[page_num].set_result(context_tail(markdown, self.context_chars))
+                else:
+                    pending.append(page_num)
+            # Bounds the rendered pages held in memory while they wait for a model slot
+            slots = asyncio.Semaphore(self.workers + self.concurrency)
+            page_stats = await asyncio.gather(*(
+                self._convert_page(pdf_filepath, page_num, checkpoints, writer, tails, slots) for page_num in pending
+            ))
+        finally:
+            writer.close()
+        done = [s for s in page_stats if s is not None]
+        images = [s for s in done if s["kind"] == "image"]
+        stats = {
+            "pages": page_count,
+            "converted": len(done),
+            "from_checkpoint": page_count - len(pending),
+            "errors": len(pending) - len(done),
+            "text_pages": len(done) - len(images),
+            "render_ms": sum(s["render_ms"] for s in done),
+            "encode_ms": sum(s["encode_ms"] for s in done),
+            "image_bytes": sum(s["bytes"] for s in images),
+            "cache_hits": self.cache.hits - cache_hits if self.cache is not None else 0,
+            "seconds": time.perf_counter() - start,
+        }
+        print(f"Markdown saved to {output_path} ({stats['converted']} converted, "
+              f"{stats['from_checkpoint']} from checkpoints, {stats['cache_hits']} from cache, "
+              f"{stats['errors']} errors, {stats['seconds']:.1f} s)")
+        if done:
+            print(f"  {len(images)} pages rendered, {stats['text_pages']} sent as text | "
+                  f"render {stats['render_ms'] / len(done):.0f} ms/page, encode {stats['encode_ms'] / len(done):.0f} ms/page | "
+                  f"{stats['image_bytes'] / max(1, len(images)) / 1024:.0f} KiB/image")
+        return stats
+
+    async def convert_directory(self, pdf_directory, markdown_directory):
+        """Convert every PDF under ``pdf_directory``, mirroring its layout in ``markdown_directory``."""
+        pdf_root = Path(pdf_directory)
+        stats = []
+        for pdf_filepath in sorted(p for p in pdf_root.rglob("*") if p.suffix.lower() == ".pdf"):
+            markdown_filepath = Path(markdown_directory) / pdf_filepath.relative_to(pdf_root).with_suffix(".md")
+            stats.append(await self.convert(str(pdf_filepath), str(markdown_filepath)))
+        return stats
+
+def _run(coro):
+    # Notebooks already run an event loop: run the conversion on a thread with its own
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(value=asyncio.run(coro)))
+    thread.start()
+    thread.join()
+    return result["value"]
+
+def pdf_to_markdown(pdf_filepath, markdown_filepath, prompt, model, api=False, **options):
+    """Convert one PDF, with the notebooks' signature. ``options`` are passed to PdfConverter.
+
+    Answers are cached in ``CACHE_DIR`` unless ``cache=None`` is passed.
+    """
+    options.setdefault("cache", PageCache())
+
+    async def convert():
+        with PdfConverter(make_backend(model, api), prompt, **options) as converter:
+            return await converter.convert(pdf_filepath, markdown_filepath)
+    return _run(convert())
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert PDFs to Markdown with a vision model.")
+    parser.add_argument("pdf", help="A PDF file or a directory searched recursively for PDFs")
+    parser.add_argument("--out", default="md", help="Output directory")
+    parser.add_argument("--backend", default="mistral", choices=["mistral", "ollama"])
+    parser.add_argument("--model", default="mistral-small-latest")
+    parser.add_argument("--prompt-file", help="Text file with the prompt (default: the French geography prompt)")
+    parser.add_argument("--workers", type=int, default=None, help="Render processes (default: one per CPU)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Model calls in flight")
+    parser.add_argument("--rps", type=float, default=2.0, help="Maximum model calls started per second (0: no limit)")
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--chain-context", action="store_true",
+                        help="Include the previous page's Markdown in each prompt (serializes model calls)")
+    parser.add_argument("--max-side", type=int, default=None,
+                        help="Longest image side sent to the model (default: 1540 for mistral, 1024 for ollama)")
+    parser.add_argument("--format", default="jpeg", choices=list(IMAGE_FORMATS),
+                        help="Image codec (webp is smaller but not every Ollama model reads it)")
+    parser.add_argument("--text-layer", action="store_true",
+                        help="Send pages with an extractable text layer and no picture as text, without rendering")
+    parser.add_argument("--context-chars", type=int, default=1500,
+                        help="With --chain-context, characters of the previous page's end passed as context")
+    parser.add_argument("--stream", action="store_true", help="Stream model tokens into the output file")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="Directory of cached model answers")
+    parser.add_argument("--cache-max-mb", type=int, default=CACHE_MAX_MB, help="Cache size before the oldest answers are evicted")
+    parser.add_argument("--no-cache", action="store_true", help="Always call the model")
+    parser.add_argument("--header-height", type=int, default=DEFAULT_CROP["header_height"],
+                        help="Pixels cut from the top of each page at 300 DPI (0 keeps the header)")
+    parser.add_argument("--footer-height", type=int, default=DEFAULT_CROP["footer_height"],
+                        help="Pixels cut from the bottom of each page at 300 DPI (0 keeps the footer)")
+    args = parser.parse_args()
+
+    prompt = Path(args.prompt_file).read_text(encoding="utf-8") if args.prompt_file else FRENCH_PROMPT
+    crop = {
+        "remove_header": args.header_height > 0, "remove_footer": args.footer_height > 0,
+        "header_height": args.header_height, "footer_height": args.footer_height,
+    }
+    backend = make_backend(args.model, api=args.backend == "mistral")
+
+    async def run():
+        with PdfConverter(backend, prompt, workers=args.workers, concurrency=args.concurrency,
+                          max_per_second=args.rps, retries=args.retries,
+                          chain_context=args.chain_context, crop=crop, max_side=args.max_side,
+                          image_format=args.format, text_layer=args.text_layer,
+                          cache=None if args.no_cache else PageCache(args.cache_dir, args.cache_max_mb),
+                          context_chars=args.context_chars, stream=args.stream) as converter:
+            if os.path.isdir(args.pdf):
+                return await converter.convert_directory(args.pdf, args.out)
+            return [await converter.convert(args.pdf, str(Path(args.out) / Path(args.pdf).with_suffix(".md").name))]
+
+    stats = asyncio.run(run())
+    errors = sum(s["errors"] for s in stats)
+    print(f"{len(stats)} PDF(s), {sum(s['pages'] for s in stats)} pages, {errors} page errors")
+    sys.exit(1 if errors else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Async Mistral, Ollama and Azure OpenAI clients for LightRAG.
+
+- One SDK client per backend, created on first use: its HTTP connections are reused by
+  every call.
+- Requests, and optionally tokens, go through a token bucket, and at most `concurrency`
+  calls run at once.
+- Texts to embed are packed into requests of at most `max_batch_tokens` tokens and
+  `max_batch_size` texts, which are sent concurrently.
+- Rate-limit, server and connection errors are retried with exponential backoff.
+
+    client = MistralClient(model="mistral-small-latest", embed_model="mistral-embed")
+    rag = LightRAG(..., embedding_func=client.embedding_func(1024), llm_model_func=client.complete,
+                   embedding_batch_num=128)
+"""
+import os
+import abc
+import time
+import random
+import asyncio
+
+import numpy as np
+from lightrag.utils import EmbeddingFunc, logger
+
+MAX_BATCH_TOKENS = 8192
+RETRY_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+def estimate_tokens(text):
+    """Upper estimate of a text's token count: one token per 3 UTF-8 bytes."""
+    return len(text.encode("utf-8")) // 3 + 1
+
+def token_batches(texts, max_tokens=MAX_BATCH_TOKENS, max_size=128):
+    """Split `texts` into consecutive batches of at most `max_tokens` estimated tokens and `max_size` texts."""
+    batches, batch, tokens = [], [], 0
+    for text in texts:
+        count = estimate_tokens(text)
+        if batch and (tokens + count > max_tokens or len(batch) == max_size):
+            batches.append(batch)
+            batch, tokens = [], 0
+        batch.append(text)
+        tokens += count
+    if batch:
+        batches.append(batch)
+    return batches
+
+def status_code(error):
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+def is_retryable(error):
+    status = status_code(error)
+    if status is not None:
+        return status in RETRY_STATUS
+    # SDKs wrap httpx's connection and timeout errors in their own classes
+    return isinstance(error, (TimeoutError, ConnectionError)) or any(
+        word in type(error).__name__ for word in ("Connect", "Timeout", "Transport")
+    )
+
+def retry_after(error):
+    """Seconds asked for by a Retry-After header, if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+class TokenBucket:
+    """Allows `rate` units per second on average, in bursts of up to `capacity` (a rate of 0 disables it)."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount=1):
+        if not self.rate:
+            return
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+class RateLimitedClient(abc.ABC):
+    """Rate limits, retries and embedding batches shared by the backends below.
+
+    A client follows the running event loop from one call to the next, so it can be reused
+    across asyncio.run() calls, but not from several loops at once (threads).
+    """
+
+    name = None
+    requests_per_second = 0
+
+    def __init__(self, model=None, embed_model=None, requests_per_second=None, tokens_per_minute=0,
+                 concurrency=8, max_batch_tokens=MAX_BATCH_TOKENS, max_batch_size=128, retries=4):
+        self.model = model
+        self.embed_model = embed_model
+        rps = self.requests_per_second if requests_per_second is None else requests_per_second
+        self.requests = TokenBucket(rps)
+        self.tokens = TokenBucket(tokens_per_minute / 60, capacity=tokens_per_minute)
+        self.concurrency = concurrency
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.retries = retries
+        self.stats = {"requests": 0, "retries": 0, "texts_embedded": 0}
+        self._client = None
+        self._slots = None
+        self._loop = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = self._make_client()
+        return self._client
+
+    @abc.abstractmethod
+    def _make_client(self):
+        """SDK client of the backend."""
+
+    @abc.abstractmethod
+    async def _embed(self, texts):
+        """One embedding request: a vector per text."""
+
+    @abc.abstractmethod
+    async def _complete(self, messages, options):
+        """One chat completion request: the answer's text."""
+
+    def _bind_loop(self):
+        """Start over with new primitives and SDK client in a new event loop (e.g. a second asyncio.run)."""
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        self._loop = loop
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self.requests._lock = asyncio.Lock()
+        self.tokens._lock = asyncio.Lock()
+        # The SDK client's connections belong to the loop it was first used in
+        self._client = None
+
+    async def _call(self, request, tokens=1):
+        self._bind_loop()
+        for attempt in range(self.retries + 1):
+            await self.requests.acquire()
+            await self.tokens.acquire(tokens)
+            try:
+                async with self._slots:
+                    self.stats["requests"] += 1
+                    return await request()
+            except Exception as error:
+                if attempt == self.retries or not is_retryable(error):
+                    raise
+                delay = retry_after(error) or min(60, 2 ** attempt) * random.uniform(0.5, 1.0)
+                self.stats["retries"] += 1
+                logger.warning(f"{self.name}: {type(error).__name__} ({status_code(error)}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        batches = token_batches(texts, self.max_batch_tokens, self.max_batch_size)
+        results = await asyncio.gather(*(
+            self._call(lambda batch=batch: self._embed(batch), sum(map(estimate_tokens, batch))) for batch in batches
+        ))
+        self.stats["texts_embedded"] += len(texts)
+        return np.array([vector for result in results for vector in result], dtype=np.float32)
+
+    async def complete(self, prompt, system_prompt=None, history_messages=None, **kwargs) -> str:
+        """LightRAG ``llm_model_func``; other LightRAG keyword arguments are ignored."""
+        messages = [{"role": "system", "content": system_prompt or "You are a helpful assistant."}]
+        messages += history_messages or []
+        messages.append({"role": "user", "content": prompt})
+        options = {key: kwargs[key] for key in ("temperature", "max_tokens", "top_p") if kwargs.get(key) is not None}
+        if isinstance(kwargs.get("response_format"), dict):
+            options["response_format"] = kwargs["response_format"]
+        tokens = sum(estimate_tokens(message["content"]) for message in messages)
+        return await self._call(lambda: self._complete(messages, options), tokens)
+
+    def embedding_func(self, embedding_dim, max_token_size=MAX_BATCH_TOKENS):
+        return EmbeddingFunc(embedding_dim=embedding_dim, max_token_size=max_token_size, func=self.embed)
+
+class MistralClient(RateLimitedClient):
+    name = "mistral"
+    requests_per_second = 5
+
+    def __init__(self, model="mistral-small-latest", embed_model="mistral-embed", api_key=None, **options):
+        super().__init__(model, embed_model, **options)
+        self.api_key = api_key or os.getenv("MISTRAL_API_KEY")
+
+    def _make_client(self):
+        from mistralai import Mistral
+        return Mistral(api_key=self.api_key)
+
+    async def _embed(self, texts):
+        response = await self.client.embeddings.create_async(model=self.embed_model, inputs=texts)
+        return [item.embedding for item in response.data]
+
+    async def _complete(self, messages, options):
+        response = await self.client.chat.complete_async(model=self.model, messages=messages, **options)
+        return response.choices[0].message.content
+
+class OllamaClient(RateLimitedClient):
+    name = "ollama"
+
+    def __init__(self, model=None, embed_model="nomic-embed-text", host=None, concurrency=2, **options):
+        super().__init__(model, embed_model, concurrency=concurrency, **options)
+        self.host = host or os.getenv("OLLAMA_HOST", "http://localhost:11434")
+
+    def _make_client(self):
+        import ollama
+        return ollama.AsyncClient(host=self.host)
+
+    async def _embed(self, texts):
+        response = await self.client.embed(model=self.embed_model, input=texts)
+        return response["embeddings"]
+
+    async def _complete(self, messages, options):
+        model_options = {"num_predict" if key == "max_tokens" else key: value
+                         for key, value in options.items() if key != "response_format"}
+        response = await self.client.chat(model=self.model, messages=messages, options=model_options,
+                                          format="json" if "response_format" in options else None)
+        return response["message"]["content"]
+
+class AzureOpenAIClient(RateLimitedClient):
+    """Deployments and credentials default to the environment variables LightRAG's Azure functions read."""
+
+    name = "azure"
+    requests_per_second = 10
+
+    def __init__(self, model=None, embed_model=None, api_key=None, endpoint=None, api_version=None, **options):
+        super().__init__(
+            model or os.getenv("AZURE_OPENAI_DEPLOYMENT") or os.getenv("LLM_MODEL", "gpt-4o-mini"),
+            embed_model or os.getenv("AZURE_EMBEDDING_DEPLOYMENT")
+            or os.getenv("EMBEDDING_MODEL", "text-embedding-3-small"),
+            **options,
+        )
+        self.api_key = api_key or os.getenv("AZURE_OPENAI_API_KEY") or os.getenv("LLM_BINDING_API_KEY")
+        self.endpoint = endpoint or os.getenv("AZURE_OPENAI_ENDPOINT") or os.getenv("LLM_BINDING_HOST")
+        self.api_version = (api_version or os.getenv("AZURE_OPENAI_API_VERSION") or os.getenv("OPENAI_API_VERSION")
+                            or "2024-08-01-preview")
+
+    def _make_client(self):
+        from openai import AsyncAzureOpenAI
+        return AsyncAzureOpenAI(api_key=self.api_key, azure_endpoint=self.endpoint, api_version=self.api_version)
+
+    async def _embed(self, texts):
+        response = await self.client.embeddings.create(model=self.embed_model, input=texts)
+        return [item.embedding for item in response.data]
+
+    async def _complete(self, messages, options):
+        response = await self.client.chat.completions.create(model=self.model, messages=messages, **options)
+        return response.choices[0].message.content
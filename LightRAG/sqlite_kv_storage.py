@@ -0,0 +1,274 @@
+"""
+SQLite key-value storage for LightRAG.
+
+JsonKVStorage loads a whole ``kv_store_<namespace>.json`` file at start-up and rewrites it
+on every flush; the LLM response cache is the largest of them. SQLiteKVStorage keeps each
+namespace in ``kv_store_<namespace>.sqlite``: records are read when they are looked up and
+written one by one.
+
+    import sqlite_kv_storage  # registers "SQLiteKVStorage"
+    rag = LightRAG(..., kv_storage="SQLiteKVStorage")
+
+An existing JSON file is imported the first time a namespace is opened (the JSON file is
+kept). For the ``*_cache`` namespaces:
+
+- each cache key ``<mode>:<cache_type>:<hash>`` is stored with its mode, so entity
+  extraction (``default``) and each query mode can be counted and evicted separately;
+- query entries not read for ``LLM_CACHE_MAX_AGE_DAYS`` days are evicted, then the least
+  recently read entries past ``LLM_CACHE_MAX_MB``, query entries before extraction ones;
+- the hit rate of each mode since the last flush is logged at the end of each insert batch
+  and returned by ``hit_rates()``.
+"""
+import os
+import json
+import time
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, ClassVar, final
+
+from lightrag.base import BaseKVStorage
+from lightrag.exceptions import StorageNotInitializedError
+from lightrag.utils import generate_cache_key, load_json, logger
+
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "512"))
+LLM_CACHE_MAX_AGE_DAYS = float(os.getenv("LLM_CACHE_MAX_AGE_DAYS", "30"))
+EXTRACTION_MODE = "default"  # mode of the entity extraction entries
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    id TEXT PRIMARY KEY,
+    mode TEXT,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    create_time INTEGER NOT NULL,
+    update_time INTEGER NOT NULL,
+    access_time INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS kv_mode_access ON kv (mode, access_time);
+"""
+
+def cache_mode(key):
+    """Mode of a flattened cache key, None for other keys."""
+    parts = key.split(":")
+    return parts[0] if len(parts) == 3 else None
+
+def flatten_legacy_cache(data):
+    """Turn the nested ``{mode: {hash: entry}}`` cache files into flattened keys."""
+    flattened = {}
+    for key, value in data.items():
+        if isinstance(value, dict) and value and all(isinstance(v, dict) and "return" in v for v in value.values()):
+            for cache_hash, entry in value.items():
+                flattened[generate_cache_key(key, entry.get("cache_type", "extract"), cache_hash)] = entry
+        else:
+            flattened[key] = value
+    return flattened
+
+@final
+@dataclass
+class SQLiteKVStorage(BaseKVStorage):
+    """LightRAG KV storage in one SQLite file per namespace (see the module docstring).
+
+    Single process: unlike JsonKVStorage, the data is not shared with other workers.
+    """
+
+    supports_strict_point_reads: ClassVar[bool] = True
+
+    def __post_init__(self):
+        directory = self.global_config["working_dir"]
+        if self.workspace:
+            directory = os.path.join(directory, self.workspace)
+        os.makedirs(directory, exist_ok=True)
+        self._path = os.path.join(directory, f"kv_store_{self.namespace}.sqlite")
+        self._json_path = os.path.join(directory, f"kv_store_{self.namespace}.json")
+        self._is_cache = self.namespace.endswith("_cache")
+        self._db = None
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self._hits = {}  # mode -> keys found since the last flush
+        self._misses = {}  # mode -> keys not found (and not found later)
+
+    async def initialize(self):
+        if self._db is not None:
+            return
+        imported = not os.path.exists(self._path) and os.path.exists(self._json_path)
+        self._db = sqlite3.connect(self._path, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        if imported:
+            data = load_json(self._json_path) or {}
+            if self._is_cache:
+                data = flatten_legacy_cache(data)
+            self._write(data, keep_times=True)
+            logger.info(f"[{self.workspace}] Imported {len(data)} records of {self._json_path} into {self._path}")
+
+    def _conn(self):
+        if self._db is None:
+            raise StorageNotInitializedError("SQLiteKVStorage")
+        return self._db
+
+    @contextmanager
+    def _transaction(self):
+        """The connection is in autocommit mode, so multi-statement writes begin their own transaction."""
+        db = self._conn()
+        db.execute("BEGIN")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def _write(self, data, keep_times=False):
+        now = int(time.time())
+        existing = self._existing_times(list(data))
+        rows = []
+        # The values are updated in place, as JsonKVStorage does
+        for key, value in data.items():
+            if self.namespace.endswith("text_chunks"):
+                value.setdefault("llm_cache_list", [])
+            if keep_times:
+                create_time = value.setdefault("create_time", now)
+                update_time = value.setdefault("update_time", create_time)
+            else:
+                create_time = value["create_time"] = existing.get(key, now)
+                update_time = value["update_time"] = now
+            value["_id"] = key
+            text = json.dumps(value, ensure_ascii=False)
+            rows.append((key, cache_mode(key) if self._is_cache else None, text, len(text.encode("utf-8")),
+                         create_time, update_time, now))
+        with self._transaction() as db:
+            db.executemany("INSERT OR REPLACE INTO kv VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def _select(self, column, keys):
+        """``(id, column)`` rows of the given keys, in batches below SQLite's parameter limit."""
+        db = self._conn()
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            yield from db.execute(f"SELECT id, {column} FROM kv WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+
+    def _existing_times(self, keys):
+        return dict(self._select("create_time", keys))
+
+    def _read(self, keys):
+        return {key: json.loads(value) for key, value in self._select("value", keys)}
+
+    def _count(self, key, found):
+        mode = cache_mode(key)
+        if mode is None:
+            return
+        hits, misses = self._hits.setdefault(mode, set()), self._misses.setdefault(mode, set())
+        if found:
+            hits.add(key)
+            misses.discard(key)
+        elif key not in hits:
+            misses.add(key)
+
+    async def get_by_id(self, id: str) -> dict[str, Any] | None:
+        value = self._read([id]).get(id)
+        if self._is_cache:
+            self._count(id, value is not None)
+            if value is not None:
+                self._conn().execute("UPDATE kv SET access_time = ? WHERE id = ?", (int(time.time()), id))
+        return value
+
+    async def get_by_id_strict(self, id: str) -> dict[str, Any] | None:
+        self._conn()
+        return self._read([id]).get(id)
+
+    async def get_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
+        values = self._read(list(ids))
+        return [values.get(id) for id in ids]
+
+    async def filter_keys(self, keys: set[str]) -> set[str]:
+        return set(keys) - {key for key, _ in self._select("id", list(keys))}
+
+    async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
+        if not data:
+            return
+        self._write(data)
+
+    async def delete(self, ids: list[str]) -> None:
+        with self._transaction() as db:
+            db.executemany("DELETE FROM kv WHERE id = ?", [(id,) for id in ids])
+
+    async def is_empty(self) -> bool:
+        return self._conn().execute("SELECT 1 FROM kv LIMIT 1").fetchone() is None
+
+    def hit_rates(self):
+        """``{mode: (hits, lookups)}`` since the last flush."""
+        return {mode: (len(self._hits.get(mode, ())), len(self._hits.get(mode, ())) + len(self._misses.get(mode, ())))
+                for mode in sorted(set(self._hits) | set(self._misses))}
+
+    def stats(self):
+        """``{mode: (entries, bytes)}`` of the stored records."""
+        rows = self._conn().execute("SELECT mode, COUNT(*), SUM(size) FROM kv GROUP BY mode")
+        return {mode: (count, size) for mode, count, size in rows}
+
+    def evict(self, max_mb=LLM_CACHE_MAX_MB, max_age_days=LLM_CACHE_MAX_AGE_DAYS):
+        """Drop old query entries, then the least recently read ones above `max_mb`."""
+        removed = 0
+        with self._transaction() as db:
+            if max_age_days:
+                cutoff = int(time.time() - max_age_days * 86400)
+                removed += db.execute(
+                    "DELETE FROM kv WHERE mode IS NOT ? AND access_time < ?", (EXTRACTION_MODE, cutoff)
+                ).rowcount
+            total = db.execute("SELECT COALESCE(SUM(size), 0) FROM kv").fetchone()[0]
+            limit = max_mb * 1024 * 1024
+            if total > limit:
+                victims = []
+                # Down to 90% so that eviction does not run again at the next flush
+                for key, size in db.execute(
+                    "SELECT id, size FROM kv ORDER BY mode IS ?, access_time", (EXTRACTION_MODE,)
+                ):
+                    if total <= limit * 0.9:
+                        break
+                    victims.append((key,))
+                    total -= size
+                db.executemany("DELETE FROM kv WHERE id = ?", victims)
+                removed += len(victims)
+        return removed
+
+    async def index_done_callback(self) -> None:
+        if not self._is_cache or self._db is None:
+            return
+        rates = self.hit_rates()
+        if rates:
+            logger.info(f"[{self.workspace}] LLM cache hits: " + ", ".join(
+                f"{'extraction' if mode == EXTRACTION_MODE else mode} {hits}/{lookups} ({hits / lookups:.0%})"
+                for mode, (hits, lookups) in rates.items() if lookups
+            ))
+        self._reset_counters()
+        removed = self.evict()
+        if removed:
+            logger.info(f"[{self.workspace}] Evicted {removed} entries from {self.namespace}")
+
+    async def drop(self) -> dict[str, str]:
+        try:
+            with self._transaction() as db:
+                db.execute("DELETE FROM kv")
+            self._reset_counters()
+            return {"status": "success", "message": "data dropped"}
+        except Exception as e:
+            logger.error(f"[{self.workspace}] Error dropping {self.namespace}: {e}")
+            return {"status": "error", "message": str(e)}
+
+    async def finalize(self):
+        if self._db is not None:
+            await self.index_done_callback()
+            self._db.close()
+            self._db = None
+
+def register():
+    """Make ``kv_storage="SQLiteKVStorage"`` resolvable by LightRAG."""
+    from lightrag import kg
+    kg.STORAGES.setdefault("SQLiteKVStorage", __name__)
+    implementations = kg.STORAGE_IMPLEMENTATIONS["KV_STORAGE"]["implementations"]
+    if "SQLiteKVStorage" not in implementations:
+        implementations.append("SQLiteKVStorage")
+    kg.STORAGE_ENV_REQUIREMENTS.setdefault("SQLiteKVStorage", [])
+
+register()
@@ -0,0 +1,218 @@
+"""
+Search indexes over the rows of an MmapVectorFile.
+
+    ExactIndex   one matrix product over every row: exact, time grows with the store
+    IVFIndex     inverted file: rows are grouped around k-means centroids and a query only
+                 scores the rows of its `nprobe` closest groups
+
+MmapVectorDBStorage picks one with ``vector_db_storage_cls_kwargs``:
+
+    {"vector_index": "auto",   # "exact", "ivf", or "auto": exact until ivf_min_rows live rows
+     "ivf_nprobe": 16,         # groups scored per query: higher is better recall, slower
+     "ivf_nlist": None,        # number of groups, about sqrt(rows) when None
+     "ivf_min_rows": 20000}
+
+The IVF groups are trained once the store is large enough, new rows are added to their
+closest group as they are inserted, and the groups are saved in ``vdb_<namespace>.ivf.npz``.
+They are trained again when the store has grown `IVF_RETRAIN_GROWTH` times since.
+"""
+import os
+
+import numpy as np
+
+INDEX_KINDS = ("auto", "exact", "ivf")
+IVF_MIN_ROWS = 20000
+IVF_NPROBE = 16
+IVF_RETRAIN_GROWTH = 4.0
+# k-means runs on a sample of at most this many rows per centroid
+IVF_TRAIN_ROWS_PER_LIST = 40
+IVF_TRAIN_ITERATIONS = 10
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+def top_k(rows, scores, k):
+    """The `k` best (row, score) pairs, best first."""
+    if len(scores) > k:
+        best = np.argpartition(-scores, k - 1)[:k]
+        rows, scores = rows[best], scores[best]
+    order = np.argsort(-scores, kind="stable")
+    return rows[order], scores[order]
+
+def rows_as_float32(matrix, rows, chunk_rows=4096):
+    """Yield ``(first row, block)`` blocks of the given rows widened to float32."""
+    for i in range(0, len(rows), chunk_rows):
+        yield i, np.asarray(matrix[rows[i:i + chunk_rows]], dtype=np.float32)
+
+def train_centroids(vectors, nlist, iterations=IVF_TRAIN_ITERATIONS, seed=0):
+    """Spherical k-means: unit centroids maximizing the cosine similarity of their rows."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        # Scores by blocks of rows: all at once they would take nlist floats per row
+        assignment = np.concatenate([
+            np.argmax(vectors[i:i + 4096] @ centroids.T, axis=1) for i in range(0, len(vectors), 4096)
+        ])
+        sums = np.zeros((nlist, vectors.shape[1]), dtype=np.float32)
+        np.add.at(sums, assignment, vectors)
+        empty = np.bincount(assignment, minlength=nlist) == 0
+        # An empty group restarts from a random row instead of staying unused
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = normalize(sums)
+    return centroids
+
+class ExactIndex:
+    """Scores every live row of the store."""
+
+    kind = "exact"
+
+    def __init__(self, store):
+        self.store = store
+
+    def search(self, query, k):
+        scores = self.store.scores(query)
+        live = np.flatnonzero(self.store.live)
+        return top_k(live, scores[live], k)
+
+    def add(self, first_row):
+        pass
+
+    def remap(self, old_rows):
+        pass
+
+    def maintain(self):
+        return False
+
+    def save(self):
+        pass
+
+    def remove_files(self):
+        pass
+
+class IVFIndex:
+    """Inverted-file index; searches exactly until it has been trained (see the module docstring)."""
+
+    kind = "ivf"
+
+    def __init__(self, store, nprobe=IVF_NPROBE, nlist=None, min_rows=IVF_MIN_ROWS):
+        self.store = store
+        self.exact = ExactIndex(store)
+        self.nprobe = nprobe
+        self.nlist = nlist
+        self.min_rows = min_rows
+        self.centroids = None
+        self.assignment = np.zeros(0, dtype=np.int32)  # group of each row of the vector file
+        self.lists = []  # rows of each group, ascending
+        self.trained_rows = 0
+        self.dirty = False  # changed since the last save
+        self._load()
+
+    @property
+    def path(self):
+        return os.path.join(self.store.directory, f"vdb_{self.store.namespace}.ivf.npz")
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with np.load(self.path) as saved:
+            if int(saved["generation"]) != self.store.generation or saved["centroids"].shape[1] != self.store.embedding_dim:
+                return  # made for another vector file: trained again when needed
+            self.centroids = saved["centroids"]
+            self.trained_rows = int(saved["trained_rows"])
+            assignment = saved["assignment"][:self.store.rows]
+        self._set_assignment(assignment)
+        # Rows appended after the last save
+        self.add(len(assignment))
+
+    def _set_assignment(self, assignment):
+        self.assignment = np.asarray(assignment, dtype=np.int32)
+        order = np.argsort(self.assignment, kind="stable")
+        bounds = np.searchsorted(self.assignment[order], np.arange(1, len(self.centroids)))
+        self.lists = np.split(order, bounds)
+
+    def _assign(self, rows):
+        assignment = np.empty(len(rows), dtype=np.int32)
+        for i, block in rows_as_float32(self.store.matrix(), rows):
+            assignment[i:i + len(block)] = np.argmax(block @ self.centroids.T, axis=1)
+        return assignment
+
+    @property
+    def trained(self):
+        return self.centroids is not None
+
+    def train(self):
+        """Fit the groups on a sample of the live rows and assign every row to one."""
+        store = self.store
+        live = np.flatnonzero(store.live)
+        nlist = self.nlist or max(1, int(round(np.sqrt(len(live)))))
+        nlist = min(nlist, len(live))
+        rng = np.random.default_rng(0)
+        sample = np.sort(rng.choice(live, min(len(live), nlist * IVF_TRAIN_ROWS_PER_LIST), replace=False))
+        self.centroids = train_centroids(np.asarray(store.matrix()[sample], dtype=np.float32), nlist)
+        self.trained_rows = len(live)
+        self._set_assignment(self._assign(np.arange(store.rows)))
+        self.dirty = True
+
+    def add(self, first_row):
+        """Assign the rows appended from `first_row` on to their closest group."""
+        if not self.trained or first_row >= self.store.rows:
+            return
+        rows = np.arange(first_row, self.store.rows)
+        assignment = self._assign(rows)
+        self.assignment = np.concatenate([self.assignment[:first_row], assignment])
+        for group in np.unique(assignment):
+            self.lists[group] = np.concatenate([self.lists[group], rows[assignment == group]])
+        self.dirty = True
+
+    def remap(self, old_rows):
+        """Follow a compaction that moved row ``old_rows[i]`` to row ``i``."""
+        if self.trained:
+            self._set_assignment(self.assignment[old_rows])
+            self.dirty = True
+
+    def maintain(self):
+        """Train the groups once the store is large enough, and again after it grew a lot."""
+        live_rows = len(self.store.records)
+        if live_rows < max(self.min_rows, 1):
+            return False
+        if self.trained and live_rows < self.trained_rows * IVF_RETRAIN_GROWTH:
+            return False
+        self.train()
+        return True
+
+    def search(self, query, k):
+        if not self.trained:
+            return self.exact.search(query, k)
+        query = normalize(query)
+        nprobe = min(self.nprobe, len(self.centroids))
+        probed = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        candidates = np.sort(np.concatenate([self.lists[group] for group in probed]))
+        candidates = candidates[self.store.live[candidates]]
+        if len(candidates) < k or len(candidates) > self.store.rows // 4:
+            # Too few rows to fill top_k, or so many that gathering them costs more than a full scan
+            return self.exact.search(query, k)
+        vectors = np.asarray(self.store.matrix()[candidates], dtype=np.float32)
+        return top_k(candidates, vectors @ query, k)
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp = self.path + ".tmp.npz"
+        np.savez(tmp, centroids=self.centroids, assignment=self.assignment,
+                 generation=self.store.generation, trained_rows=self.trained_rows)
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+    def remove_files(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+def make_index(store, kind="auto", nprobe=IVF_NPROBE, nlist=None, min_rows=IVF_MIN_ROWS):
+    if kind not in INDEX_KINDS:
+        raise ValueError(f"vector_index must be one of {INDEX_KINDS}, not {kind!r}")
+    if kind == "exact":
+        return ExactIndex(store)
+    # "ivf" trains as soon as there is something to group; "auto" waits for min_rows
+    return IVFIndex(store, nprobe=nprobe, nlist=nlist, min_rows=1 if kind == "ivf" else min_rows)
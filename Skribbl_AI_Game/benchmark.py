@@ -0,0 +1,157 @@
+"""
+Headless benchmark of the Skribbl guessing path.
+
+Replays the recorded drawings of a corpus stroke by stroke on a hidden display (SDL
+dummy driver), asks the backend for a guess after each stroke, like a mouse-up in the
+game, and reports encode time, payload size, guess latency and accuracy per word.
+
+    python benchmark.py                                # offline stub backend (pipeline check)
+    python benchmark.py --backend mistral              # Mistral API (MISTRAL_API_KEY)
+    python benchmark.py --backend ollama --format png  # local Ollama server
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import asyncio
+import glob
+import json
+import statistics
+import time
+from dotenv import load_dotenv
+load_dotenv()  # before the engine import: it reads its settings from the environment
+import pygame
+from skribbl_engine import (
+    AI_IMAGE_FORMAT, AI_IMAGE_SIZE, AI_PROMPT, StrokeStore, StubBackend, make_backend, prepare_image,
+)
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+
+def load_corpus(directory):
+    """(word, recorded drawing) pairs from the JSON files written by save_drawing()."""
+    drawings = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        drawings.append((data["word"], data))
+    return drawings
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+async def replay_drawing(backend, word, data, screen, args):
+    """Redraw `data` stroke by stroke and guess after each one, until the word is found."""
+    recorded = StrokeStore.from_dict(data)
+    canvas = StrokeStore(screen.get_rect())
+    screen.fill((255, 255, 255))
+    encode_ms, payload_bytes, latency_ms, guesses = [], [], [], []
+    strokes_to_guess = None
+    for number, stroke in enumerate(recorded.strokes, 1):
+        points = stroke.points
+        canvas.begin(screen, stroke.color, stroke.size, (points[0], points[1]))
+        for i in range(2, len(points), 2):
+            canvas.extend(screen, (points[i], points[i + 1]))
+        pygame.display.update()
+
+        image, mime, timings = prepare_image(canvas.snapshot(), args.image_size, args.format)
+        encode_ms.append(timings["raster_ms"] + timings["resize_ms"] + timings["encode_ms"])
+        payload_bytes.append(timings["bytes"])
+        start = time.perf_counter()
+        guess = await backend.guess(image, mime, AI_PROMPT)
+        latency_ms.append((time.perf_counter() - start) * 1000)
+        guesses.append(guess)
+        if word.lower() in guess:
+            strokes_to_guess = number
+            if not args.all_strokes:
+                break
+    return {
+        "word": word,
+        "strokes": len(recorded.strokes),
+        "strokes_to_guess": strokes_to_guess,
+        "guessed": strokes_to_guess is not None,
+        "guesses": guesses,
+        "encode_ms": encode_ms,
+        "payload_bytes": payload_bytes,
+        "latency_ms": latency_ms,
+    }
+
+def summarize(results):
+    encode = [v for r in results for v in r["encode_ms"]]
+    payload = [v for r in results for v in r["payload_bytes"]]
+    latency = [v for r in results for v in r["latency_ms"]]
+    guessed = [r for r in results if r["guessed"]]
+    return {
+        "drawings": len(results),
+        "accuracy": len(guessed) / len(results) if results else 0.0,
+        "mean_strokes_to_guess": statistics.mean(r["strokes_to_guess"] for r in guessed) if guessed else None,
+        "guess_requests": len(latency),
+        "encode_ms_p50": percentile(encode, 50),
+        "encode_ms_p95": percentile(encode, 95),
+        "payload_bytes_mean": statistics.mean(payload) if payload else 0,
+        "latency_ms_p50": percentile(latency, 50),
+        "latency_ms_p95": percentile(latency, 95),
+    }
+
+def print_report(results, summary, backend_name):
+    print(f"{'word':<12} {'found at':>9} {'last answer':<16} {'encode ms':>9} {'KiB':>6} {'latency ms':>10}")
+    for r in results:
+        found = f"{r['strokes_to_guess']}/{r['strokes']}" if r["guessed"] else f"-/{r['strokes']}"
+        print(
+            f"{r['word']:<12} {found:>9} {r['guesses'][-1][:16]:<16} {statistics.mean(r['encode_ms']):9.1f} "
+            f"{statistics.mean(r['payload_bytes']) / 1024:6.1f} {statistics.mean(r['latency_ms']):10.0f}"
+        )
+    print()
+    # The stub's references are the corpus itself: it checks the pipeline, not a model
+    guessed = "matched their own recording" if backend_name == "stub" else "guessed"
+    print(
+        f"{backend_name}: {summary['accuracy']:.0%} of {summary['drawings']} drawings {guessed}, "
+        f"{summary['guess_requests']} requests | encode p50 {summary['encode_ms_p50']:.1f} ms, "
+        f"p95 {summary['encode_ms_p95']:.1f} ms | payload {summary['payload_bytes_mean'] / 1024:.1f} KiB | "
+        f"latency p50 {summary['latency_ms_p50']:.0f} ms, p95 {summary['latency_ms_p95']:.0f} ms"
+    )
+
+async def run(args):
+    drawings = load_corpus(args.corpus)
+    if not drawings:
+        raise SystemExit(f"No recorded drawings in {args.corpus}")
+    if args.backend == "stub":
+        references = [(word, StrokeStore.from_dict(data)) for word, data in drawings]
+        backend = StubBackend(references, latency_ms=args.stub_latency_ms)
+    else:
+        backend = make_backend(args.backend, **({"model": args.model} if args.model else {}))
+    pygame.display.init()
+    width, height = drawings[0][1]["width"], drawings[0][1]["height"]
+    screen = pygame.display.set_mode((width, height))
+    try:
+        return [await replay_drawing(backend, word, data, screen, args) for word, data in drawings], backend.name
+    finally:
+        pygame.display.quit()
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded Skribbl drawings against a guessing backend.")
+    parser.add_argument("--corpus", default=CORPUS_DIR, help="Directory of recorded drawings (JSON)")
+    parser.add_argument("--backend", default="stub", choices=["stub", "mistral", "ollama"])
+    parser.add_argument("--model", help="Model name for the mistral/ollama backends")
+    parser.add_argument("--image-size", type=int, default=AI_IMAGE_SIZE, help="Longest side of the image sent")
+    parser.add_argument("--format", default=AI_IMAGE_FORMAT, choices=["png", "webp"])
+    parser.add_argument("--stub-latency-ms", type=int, default=0, help="Simulated round trip of the stub backend")
+    parser.add_argument("--all-strokes", action="store_true", help="Keep guessing after the word is found")
+    parser.add_argument("--output", help="Write the per-word results and summary to this JSON file")
+    args = parser.parse_args()
+
+    results, backend_name = asyncio.run(run(args))
+    summary = summarize(results)
+    print_report(results, summary, backend_name)
+    if args.output:
+        if backend_name == "stub":
+            summary["pipeline_check"] = summary.pop("accuracy")
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"backend": backend_name, "image_size": args.image_size, "format": args.format,
+                       "summary": summary, "results": results}, f, indent=2, ensure_ascii=False)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
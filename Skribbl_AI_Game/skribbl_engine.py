@@ -0,0 +1,567 @@
+"""
+Skribbl AI engine: the capture -> encode -> guess path of the game, without a window.
+
+Drawings are StrokeStore objects; prepare_image() turns one into the image sent to
+the model, and GuessScheduler runs guesses in the background against a backend
+(Mistral, a local Ollama server, or an offline stub). Importing this module opens
+no window and makes no network call, so it can run headless (SDL dummy driver).
+"""
+import os
+import json
+import time
+import queue
+import asyncio
+import threading
+import base64
+from array import array
+from collections import OrderedDict
+from io import BytesIO
+from PIL import Image, features
+import pygame
+
+WHITE = (255, 255, 255)
+AI_PROMPT = "Qu'est-ce que l'utilisateur dessine ? Répondez avec un seul mot en français. S'il n'y a pas de dessin, répondez 'rien'."
+
+# --- Canvas Capture Settings ---
+# Longest side (px) of the image sent to the model, and its codec ("png" or "webp")
+AI_IMAGE_SIZE = int(os.getenv("SKRIBBL_AI_IMAGE_SIZE", "512"))
+AI_IMAGE_FORMAT = os.getenv("SKRIBBL_AI_IMAGE_FORMAT", "png").lower()
+CAPTURE_MARGIN = 16  # white border kept around the strokes
+# When set, each finished drawing is saved there as JSON (replayable stroke list)
+RECORD_DIR = os.getenv("SKRIBBL_RECORD_DIR")
+BLANK_IMAGE = Image.new("RGB", (64, 64), WHITE)
+
+# --- Stroke Store ---
+class Stroke:
+    """One brush stroke: colour, brush size and a flat x, y point list in canvas coordinates."""
+    __slots__ = ("color", "size", "points", "rect")
+
+    def __init__(self, color, size, points=()):
+        self.color = tuple(color)
+        self.size = size
+        self.points = array("i", points)
+        self.rect = None
+        for i in range(0, len(self.points), 2):
+            self._grow(self.points[i], self.points[i + 1])
+
+    def _grow(self, x, y):
+        radius = self.size // 2 + 1
+        dot = pygame.Rect(x - radius, y - radius, 2 * radius, 2 * radius)
+        self.rect = dot if self.rect is None else self.rect.union(dot)
+
+    def add(self, x, y):
+        self.points.extend((x, y))
+        self._grow(x, y)
+
+    def draw(self, surface, offset=(0, 0), scale=1.0):
+        """Paint the stroke as it was drawn live: a dot, then one line per mouse move."""
+        ox, oy = offset
+        points = self.points
+        width = max(1, round(self.size * scale))
+        start = (ox + points[0] * scale, oy + points[1] * scale)
+        pygame.draw.circle(surface, self.color, start, max(1, width // 2))
+        for i in range(2, len(points), 2):
+            end = (ox + points[i] * scale, oy + points[i + 1] * scale)
+            pygame.draw.line(surface, self.color, start, end, width)
+            start = end
+
+class StrokeStore:
+    """The strokes of the current drawing: the source of truth for both the screen and the AI.
+
+    Positions passed in and rects returned are screen coordinates; strokes are kept
+    relative to the top-left of `area` so they can be replayed on any canvas.
+    """
+
+    def __init__(self, area, strokes=()):
+        self.area = pygame.Rect(area)
+        self.strokes = list(strokes)
+
+    def _to_canvas(self, pos):
+        return pos[0] - self.area.x, pos[1] - self.area.y
+
+    def _to_screen(self, rect):
+        return rect.move(self.area.x, self.area.y)
+
+    def begin(self, surface, color, size, pos):
+        """Start a stroke at `pos`, paint its first dot on `surface` and return the dirty rect."""
+        stroke = Stroke(color, size, self._to_canvas(pos))
+        self.strokes.append(stroke)
+        return self._paint(surface, pygame.draw.circle, stroke.color, pos, max(1, size // 2))
+
+    def extend(self, surface, pos):
+        """Add `pos` to the current stroke, paint the new segment and return the dirty rect."""
+        if not self.strokes:  # cleared while the button was still down
+            return None
+        stroke = self.strokes[-1]
+        x, y = self._to_canvas(pos)
+        last = (stroke.points[-2], stroke.points[-1])
+        if (x, y) == last:
+            return None
+        stroke.add(x, y)
+        start = (last[0] + self.area.x, last[1] + self.area.y)
+        return self._paint(surface, pygame.draw.line, stroke.color, start, pos, stroke.size)
+
+    def _paint(self, surface, draw, *args):
+        """Run a pygame.draw call clipped to the canvas, so strokes never spill onto the UI bars."""
+        previous_clip = surface.get_clip()
+        surface.set_clip(self.area.clip(previous_clip))
+        dirty = draw(surface, *args)
+        surface.set_clip(previous_clip)
+        return dirty.clip(self.area)
+
+    def undo(self):
+        """Drop the last stroke and return the screen rect that must be repainted, if any."""
+        if not self.strokes:
+            return None
+        return self._to_screen(self.strokes.pop().rect)
+
+    def clear(self):
+        self.strokes.clear()
+
+    @property
+    def bounds(self):
+        """Bounding box of all strokes in canvas coordinates, or None when empty."""
+        if not self.strokes:
+            return None
+        return self.strokes[0].rect.unionall([stroke.rect for stroke in self.strokes[1:]])
+
+    def render(self, surface, clip=None):
+        """Repaint the strokes that touch `clip` (screen rect; the whole canvas when None)."""
+        previous_clip = surface.get_clip()
+        surface.set_clip((clip or self.area).clip(self.area).clip(previous_clip))
+        for stroke in self.strokes:
+            if clip is None or self._to_screen(stroke.rect).colliderect(clip):
+                stroke.draw(surface, self.area.topleft)
+        surface.set_clip(previous_clip)
+
+    def rasterize(self, max_side=AI_IMAGE_SIZE, margin=CAPTURE_MARGIN):
+        """Draw the strokes straight at model resolution, cropped to their bounding box.
+
+        Independent of the screen: the cost depends on `max_side`, not on the display size.
+        Returns a PIL image, or None when nothing has been drawn.
+        """
+        bounds = self.bounds
+        if bounds is None:
+            return None
+        box = bounds.inflate(2 * margin, 2 * margin).clip(pygame.Rect((0, 0), self.area.size))
+        if not box.width or not box.height:
+            return None
+        scale = min(1.0, max_side / max(box.size))
+        surface = pygame.Surface((max(1, round(box.width * scale)), max(1, round(box.height * scale))))
+        surface.fill(WHITE)
+        for stroke in self.strokes:
+            stroke.draw(surface, (-box.x * scale, -box.y * scale), scale)
+        return Image.frombytes("RGB", surface.get_size(), pygame.image.tobytes(surface, "RGB"))
+
+    def snapshot(self):
+        """Independent copy, safe to rasterize from another thread while drawing continues."""
+        return StrokeStore(self.area, [Stroke(s.color, s.size, s.points) for s in self.strokes])
+
+    def to_dict(self):
+        return {
+            "width": self.area.width,
+            "height": self.area.height,
+            "strokes": [
+                {"color": list(s.color), "size": s.size, "points": s.points.tolist()}
+                for s in self.strokes
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data, area=None):
+        """Rebuild a recorded drawing, e.g. to replay it with render() or rasterize()."""
+        area = area or pygame.Rect(0, 0, data["width"], data["height"])
+        return cls(area, [Stroke(s["color"], s["size"], s["points"]) for s in data["strokes"]])
+
+def save_drawing(store, word, directory):
+    """Record the drawing made for `word` as JSON in `directory`."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{word}-{int(time.time() * 1000)}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"word": word, **store.to_dict()}, f)
+    return path
+
+# --- Image Encoding ---
+def encode_canvas(image, max_side=AI_IMAGE_SIZE, fmt=AI_IMAGE_FORMAT):
+    """Downscale (if needed) and encode a rasterized canvas.
+
+    Returns (base64 data, mime type, timings) with per-stage timings in milliseconds.
+    """
+    timings = {}
+    start = time.perf_counter()
+    image = (image or BLANK_IMAGE).copy()
+    image.thumbnail((max_side, max_side), Image.Resampling.BILINEAR)
+    timings["resize_ms"] = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    buffered = BytesIO()
+    if fmt == "webp" and features.check("webp"):
+        image.save(buffered, format="WEBP", quality=80, method=0)
+        mime = "image/webp"
+    else:
+        # Few colours on a white background: a 16-colour palette PNG is small and fast to compress
+        image.quantize(16, method=Image.Quantize.FASTOCTREE).save(buffered, format="PNG", compress_level=3)
+        mime = "image/png"
+    timings["encode_ms"] = (time.perf_counter() - start) * 1000
+    data = base64.b64encode(buffered.getvalue()).decode("utf-8")
+    timings["bytes"] = len(data)
+    timings["size"] = image.size
+    return data, mime, timings
+
+def prepare_image(strokes, max_side=AI_IMAGE_SIZE, fmt=AI_IMAGE_FORMAT):
+    """Rasterize and encode a drawing for the model: (base64 data, mime type, timings)."""
+    raster_start = time.perf_counter()
+    image = strokes.rasterize(max_side)
+    raster_ms = (time.perf_counter() - raster_start) * 1000
+    data, mime, timings = encode_canvas(image, max_side, fmt)
+    timings["raster_ms"] = raster_ms
+    return data, mime, timings
+
+# --- Backends ---
+# Which model answers: "mistral" (default), "ollama" (local server) or "stub" (offline stand-in)
+BACKEND = os.getenv("SKRIBBL_BACKEND", "mistral").lower()
+MISTRAL_MODEL = "mistral-small-latest"
+OLLAMA_MODEL = os.getenv("SKRIBBL_OLLAMA_MODEL", "llava")
+OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+
+def _clean_answer(text):
+    return text.strip().lower()
+
+class MistralBackend:
+    """Guesses with a Mistral vision model through the official client."""
+
+    name = "mistral"
+
+    def __init__(self, api_key=None, model=MISTRAL_MODEL):
+        from mistralai import Mistral
+        self.model = model
+        self.client = Mistral(api_key=api_key or os.getenv("MISTRAL_API_KEY"))
+
+    async def guess(self, image, mime, prompt):
+        messages = [
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": prompt},
+                    {"type": "image_url", "image_url": {"url": f"data:{mime};base64,{image}"}}
+                ]
+            }
+        ]
+        response = await self.client.chat.complete_async(model=self.model, messages=messages, temperature=0.0)
+        return _clean_answer(response.choices[0].message.content)
+
+class OllamaBackend:
+    """Guesses with a local vision model served by Ollama (e.g. llava). Use the png format."""
+
+    name = "ollama"
+
+    def __init__(self, model=OLLAMA_MODEL, host=OLLAMA_HOST, timeout=60.0):
+        import httpx
+        self.model = model
+        self.client = httpx.AsyncClient(base_url=host, timeout=timeout)
+
+    async def guess(self, image, mime, prompt):
+        response = await self.client.post("/api/chat", json={
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt, "images": [image]}],
+            "stream": False,
+            "options": {"temperature": 0},
+        })
+        response.raise_for_status()
+        return _clean_answer(response.json()["message"]["content"])
+
+class StubBackend:
+    """Offline stand-in: names the closest reference drawing by perceptual hash.
+
+    References are (word, StrokeStore) pairs, typically the benchmark corpus; they are
+    hashed through the same encoding as the queries. A blank image, or one further
+    than `max_distance` bits from every reference, is "rien". `latency_ms` simulates
+    the round trip of a real model.
+    """
+
+    name = "stub"
+
+    def __init__(self, references=(), max_distance=40, latency_ms=0):
+        self.references = [(word, self._hash(prepare_image(strokes)[0])) for word, strokes in references]
+        self.max_distance = max_distance
+        self.latency = latency_ms / 1000
+
+    @staticmethod
+    def _hash(data):
+        image = Image.open(BytesIO(base64.b64decode(data))).convert("L")
+        low, high = image.getextrema()
+        return None if low == high else image_hash(image)
+
+    async def guess(self, image, mime, prompt):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        key = self._hash(image)
+        if key is None:
+            return EMPTY_GUESS
+        best = min(
+            ((bin(key ^ ref).count("1"), word) for word, ref in self.references if ref is not None),
+            default=None,
+        )
+        return best[1] if best is not None and best[0] <= self.max_distance else EMPTY_GUESS
+
+def make_backend(name=BACKEND, **kwargs):
+    """Backend by name ("mistral", "ollama" or "stub")."""
+    backends = {"mistral": MistralBackend, "ollama": OllamaBackend, "stub": StubBackend}
+    if name not in backends:
+        raise ValueError(f"Unknown backend {name!r} (expected one of {', '.join(backends)})")
+    return backends[name](**kwargs)
+
+# --- Guess Cache ---
+EMPTY_GUESS = "rien"  # what the prompt asks for when nothing is drawn
+MIN_INK_SIZE = 12  # px; a drawing smaller than this (a stray click) counts as empty
+# Cached answers, and how many of the 256 hash bits may differ for a canvas to count as the same
+GUESS_CACHE_SIZE = int(os.getenv("SKRIBBL_GUESS_CACHE_SIZE", "256"))
+GUESS_CACHE_DISTANCE = int(os.getenv("SKRIBBL_GUESS_CACHE_DISTANCE", "6"))
+
+def perceptual_hash(strokes, hash_size=16):
+    """dHash of the drawing, or None when the canvas is (nearly) empty.
+
+    The strokes are rasterized small and cropped to their bounds first.
+    """
+    bounds = strokes.bounds
+    if bounds is None or max(bounds.size) < MIN_INK_SIZE:
+        return None
+    return image_hash(strokes.rasterize(max_side=4 * hash_size), hash_size)
+
+def image_hash(image, hash_size=16):
+    """dHash: reduce to a (hash_size + 1) x hash_size grayscale grid; each bit records
+    whether a cell is brighter than its right neighbour. Small edits flip only a few bits.
+    """
+    pixels = list(image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.BOX).getdata())
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+class GuessCache:
+    """LRU of AI answers keyed by perceptual hash; near-identical drawings share an answer."""
+
+    def __init__(self, max_size=GUESS_CACHE_SIZE, max_distance=GUESS_CACHE_DISTANCE):
+        self.max_size = max_size
+        self.max_distance = max_distance
+        self._entries = OrderedDict()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {"lookups": 0, "hits": 0, "empty": 0}
+
+    def get(self, key):
+        """Cached answer for a perceptual hash (None = empty canvas), or None on a miss."""
+        self.stats["lookups"] += 1
+        if key is None:
+            self.stats["empty"] += 1
+            return EMPTY_GUESS
+        match = key if key in self._entries else next(
+            (other for other in self._entries if bin(other ^ key).count("1") <= self.max_distance), None
+        )
+        if match is None:
+            return None
+        self._entries.move_to_end(match)
+        self.stats["hits"] += 1
+        return self._entries[match]
+
+    def put(self, key, guess):
+        if key is None or self.max_size <= 0:
+            return
+        self._entries[key] = guess
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def summary(self):
+        stats = self.stats
+        hits = stats["hits"] + stats["empty"]
+        rate = 100 * hits / stats["lookups"] if stats["lookups"] else 0.0
+        return (
+            f"Cache IA : {hits}/{stats['lookups']} réponses sans appel ({rate:.0f} %), "
+            f"dont {stats['empty']} toile(s) vide(s)"
+        )
+
+# --- Guess Scheduler ---
+# Quiet time after the last drawing action before a guess is sent
+GUESS_DEBOUNCE_MS = int(os.getenv("SKRIBBL_GUESS_DEBOUNCE_MS", "250"))
+# Concurrent requests and request rate allowed against the API (0 = no rate limit)
+MAX_INFLIGHT_GUESSES = int(os.getenv("SKRIBBL_MAX_INFLIGHT", "2"))
+MAX_GUESSES_PER_SECOND = float(os.getenv("SKRIBBL_MAX_RPS", "1"))
+
+class GuessJob:
+    __slots__ = ("seq", "generation", "word", "strokes", "key")
+
+    def __init__(self, seq, generation, word, strokes):
+        self.seq = seq
+        self.generation = generation
+        self.word = word
+        self.strokes = strokes
+        self.key = None
+
+class GuessScheduler:
+    """Runs AI guesses on an asyncio loop in a background thread.
+
+    The main thread calls submit() with stroke snapshots and poll() once per frame.
+    Submissions are debounced and only the newest snapshot is ever sent; drawings
+    already answered (same perceptual hash, give or take a few bits) or empty are
+    answered from `cache` without calling the API. invalidate() (new word, cleared
+    canvas) cancels in-flight requests, and results from before it, or older than a
+    result already delivered, are dropped.
+    """
+
+    def __init__(self, backend, prompt=AI_PROMPT, debounce_ms=GUESS_DEBOUNCE_MS,
+                 max_inflight=MAX_INFLIGHT_GUESSES, max_per_second=MAX_GUESSES_PER_SECOND, cache=None):
+        self.backend = backend
+        self.prompt = prompt
+        self.cache = cache if cache is not None else GuessCache()
+        self.debounce = debounce_ms / 1000
+        self.max_inflight = max(1, max_inflight)
+        self.min_interval = 1 / max_per_second if max_per_second > 0 else 0.0
+        self.generation = 0
+        self.stats = {"submitted": 0, "sent": 0, "cancelled": 0, "stale": 0, "errors": 0}
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._results = queue.SimpleQueue()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # Main thread API
+    def submit(self, strokes, word):
+        """Ask for a guess of `word` from a stroke snapshot; supersedes any pending one."""
+        with self._lock:
+            self._seq += 1
+            job = GuessJob(self._seq, self.generation, word, strokes)
+        self.stats["submitted"] += 1
+        self._loop.call_soon_threadsafe(self._on_submit, job)
+
+    def invalidate(self):
+        """Forget pending and in-flight guesses: the word changed or the canvas was cleared."""
+        with self._lock:
+            self.generation += 1
+        self._loop.call_soon_threadsafe(self._on_invalidate)
+
+    def poll(self):
+        """(word, guess) results of the current generation received since the last call."""
+        results = []
+        while True:
+            try:
+                job, guess = self._results.get_nowait()
+            except queue.Empty:
+                return results
+            if job.generation == self.generation:
+                results.append((job.word, guess))
+            else:
+                self.stats["stale"] += 1
+
+    def reset_stats(self):
+        self.stats = dict.fromkeys(self.stats, 0)
+        self.cache.reset_stats()
+
+    def close(self):
+        self.invalidate()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=1)
+
+    # Event loop side
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._latest = None
+        self._changed = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.max_inflight)
+        self._inflight = set()
+        self._next_send = 0.0
+        self._last_delivered = 0
+        dispatcher = self._loop.create_task(self._dispatch())
+        self._loop.run_forever()
+        # close() stopped the loop: cancel what is left and release the loop
+        tasks = [dispatcher, *self._inflight]
+        for task in tasks:
+            task.cancel()
+        self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self._loop.close()
+
+    def _on_submit(self, job):
+        self._latest = job
+        self._changed.set()
+
+    def _on_invalidate(self):
+        self._latest = None
+        for task in self._inflight:
+            task.cancel()
+
+    async def _dispatch(self):
+        while True:
+            await self._changed.wait()
+            # Debounce: wait until submissions stop for `debounce` seconds
+            while True:
+                self._changed.clear()
+                try:
+                    await asyncio.wait_for(self._changed.wait(), self.debounce)
+                except asyncio.TimeoutError:
+                    break
+            job = self._latest
+            if job is None or job.generation != self.generation:
+                continue
+            job.key = await self._loop.run_in_executor(None, perceptual_hash, job.strokes)
+            if job is not self._latest:
+                continue  # superseded while hashing: start over with the newer drawing
+            cached = self.cache.get(job.key)
+            if cached is not None:
+                self._latest = None
+                self._deliver(job, cached, "cache")
+                continue
+            await self._slots.acquire()
+            delay = self._next_send - self._loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if job is not self._latest:
+                # A newer drawing arrived while waiting for a slot: send that one instead
+                self._slots.release()
+                continue
+            self._latest = None
+            self._next_send = self._loop.time() + self.min_interval
+            task = self._loop.create_task(self._guess(job))
+            self._inflight.add(task)
+            # Not in _guess: a task cancelled before its first step never runs its body
+            task.add_done_callback(self._on_guess_done)
+
+    def _on_guess_done(self, task):
+        self._inflight.discard(task)
+        self._slots.release()
+        if task.cancelled():
+            self.stats["cancelled"] += 1
+
+    async def _guess(self, job):
+        try:
+            image, mime, timings = await self._loop.run_in_executor(None, prepare_image, job.strokes)
+            self.stats["sent"] += 1
+            api_start = time.perf_counter()
+            guess = await self.backend.guess(image, mime, self.prompt)
+            api_ms = (time.perf_counter() - api_start) * 1000
+        except asyncio.CancelledError:
+            self.stats["cancelled"] += 1
+            return
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"Erreur de l'IA ({self.backend.name}) : {e}")
+            return
+        # The answer is right for that drawing even if it is no longer on screen
+        self.cache.put(job.key, guess)
+        self._deliver(job, guess, (
+            f"raster {timings['raster_ms']:.1f} ms | resize {timings['resize_ms']:.1f} ms | "
+            f"encode {timings['encode_ms']:.1f} ms | {timings['size'][0]}x{timings['size'][1]} "
+            f"{mime} {timings['bytes'] / 1024:.1f} KiB | API {api_ms:.0f} ms"
+        ))
+
+    def _deliver(self, job, guess, detail):
+        if job.seq < self._last_delivered:
+            # A newer drawing was answered first
+            self.stats["stale"] += 1
+            return
+        self._last_delivered = job.seq
+        self._results.put((job, guess))
+        print(f"Mot à deviner: {job.word} | Réponse de l'IA: {guess}")
+        print(f"  {detail}")
@@ -4,17 +4,15 @@ Skribbl AI Challenge Game (Pygame Drawing Version)
 Draw the word shown in the Pygame window. The AI will try to guess what you are drawing in real time.
 Your goal is to make the AI guess as many words as possible within the time limit!
 """
-import os
 import time
 import random
-import threading
-import base64
-from io import BytesIO
-from PIL import Image
 from dotenv import load_dotenv
+load_dotenv()  # before the engine import: it reads its settings from the environment
 import pygame
-from mistralai import Mistral
 import ctypes
+from collections import deque
+from functools import lru_cache
+from skribbl_engine import RECORD_DIR, GuessScheduler, StrokeStore, make_backend, save_drawing
 
 # Set process DPI awareness (Windows only)
 try:
@@ -23,10 +21,7 @@ except Exception:
     pass
 
 # --- AI and Game Setup ---
-load_dotenv()
-MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY")
-MISTRAL_MODEL = "mistral-small-latest"
-client = Mistral(api_key=MISTRAL_API_KEY)
+backend = make_backend()
 
 challenge_words = [
     "chat", "maison", "voiture", "arbre", "chien", "vélo", "pomme", "étoile", "poisson", "fleur",
@@ -40,7 +35,6 @@ challenge_words = [
     "feu", "glace", "vent", "pluie", "neige", "orage", "arc", "épée", "bouclier", "robot"
 ]
 GAME_DURATION = 60  # seconds
-AI_PROMPT = "Qu'est-ce que l'utilisateur dessine ? Répondez avec un seul mot en français. S'il n'y a pas de dessin, répondez 'rien'."
 
 # --- Pygame Drawing Setup ---
 pygame.init()
@@ -57,7 +51,18 @@ BRUSH_SIZE = 6
 
 screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.FULLSCREEN)
 pygame.display.set_caption("Skribbl AI Challenge - Lite Paint!")
-font = pygame.font.SysFont("Segoe UI Symbol", 26)
+
+@lru_cache(maxsize=None)
+def get_font(size=26, bold=False):
+    """Load each font size once: SysFont scans the system fonts on every call."""
+    return pygame.font.SysFont("Segoe UI Symbol", size, bold=bold)
+
+@lru_cache(maxsize=256)
+def render_text(font, text, color):
+    """Rendered text surfaces, reused until the text or colour changes (never draw on them)."""
+    return font.render(text, True, color)
+
+font = get_font(26)
 clock = pygame.time.Clock()
 
 # Force event loop to help window appear
@@ -66,32 +71,6 @@ for _ in range(10):
     time.sleep(0.05)
 print("Pygame window should now be visible. If not, check for errors in the terminal.")
 
-# --- Drawing Functions ---
-def get_canvas_image():
-    """Capture the pygame drawing area as a base64 PNG image (excluding the UI area)."""
-    # Crop only the drawing area (below UI)
-    sub_surface = screen.subsurface(pygame.Rect(0, 50, WIDTH, HEIGHT-50)).copy()
-    data = pygame.image.tostring(sub_surface, 'RGB')
-    img = pygame.image.fromstring(data, (WIDTH, HEIGHT-50), 'RGB')
-    buffered = BytesIO()
-    pygame.image.save(img, buffered)
-    buffered.seek(0)
-    image = base64.b64encode(buffered.read()).decode("utf-8")
-    return image
-
-def image_to_text_guess(client, model, prompt, image):
-    messages = [
-        {
-            "role": "user",
-            "content": [
-                {"type": "text", "text": prompt},
-                {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{image}"}}
-            ]
-        }
-    ]
-    response = client.chat.complete(model=model, messages=messages, temperature=0.0)
-    return response.choices[0].message.content.strip().lower()
-
 # --- Game Logic ---
 def draw_text(surface, text, pos, color=BLACK):
     img = font.render(text, True, color)
@@ -108,7 +87,7 @@ class TextBox:
         self.padding_y = padding_y
         self.border_radius = border_radius
         self.align = align  # 'topleft', 'topright', 'center', etc.
-        self.surface = self.font.render(self.text, True, self.color)
+        self.surface = render_text(self.font, self.text, self.color)
         self.rect = self.surface.get_rect()
         # Set rect position based on alignment
         setattr(self.rect, self.align, self.pos)
@@ -123,28 +102,134 @@ class TextBox:
         pygame.draw.rect(surface, self.bg_color, self.bg_rect, border_radius=self.border_radius)
         surface.blit(self.surface, self.rect)
 
+def draw_top_bar(surface, challenge_word, seconds_left, score, jokers_left, last_ai_guess):
+    """Draw the word, timer, score, jokers and AI answer bar; returns the rect to update."""
+    pygame.draw.rect(surface, (60, 63, 65), (0,0,WIDTH,60), border_radius=0)
+    # Center vertical for all top UI texts (bar height = 60)
+    ui_bar_height = 60
+    # Mot à dessiner
+    mot_box = TextBox(
+        f"Mot à dessiner : {challenge_word}", font, (30, (ui_bar_height - font.get_height())//2),
+        (0, 180, 255), (40, 44, 52), 18, 6, 12, align="topleft"
+    )
+    mot_box.draw(surface)
+
+    # Timer, Score, Jokers (right-aligned, with consistent gap)
+    gap = 18
+    timer_font = get_font(32, bold=True)
+    timer_text = f"⏰ {seconds_left}s"
+    score_text = f"Score : {score}"
+    jokers_text = f"Jokers : {jokers_left}"
+    # Render surfaces to get widths
+    timer_surf = render_text(timer_font, timer_text, (255, 140, 0))
+    score_surf = render_text(font, score_text, (0, 200, 0))
+    timer_width = timer_surf.get_width() + 2*18  # padding_x
+    score_width = score_surf.get_width() + 2*18
+    # Positions (right-aligned)
+    timer_x = WIDTH - 30
+    score_x = timer_x - timer_width - gap
+    jokers_x = score_x - score_width - gap
+    # Draw timer
+    timer_box = TextBox(
+        timer_text, timer_font, (timer_x, (ui_bar_height - timer_font.get_height())//2),
+        (255, 140, 0), (40, 44, 52), 18, 6, 12, align="topright"
+    )
+    timer_box.draw(surface)
+    # Draw score
+    score_box = TextBox(
+        score_text, font, (score_x, (ui_bar_height - font.get_height())//2),
+        (0, 200, 0), (40, 44, 52), 18, 6, 12, align="topright"
+    )
+    score_box.draw(surface)
+    # Draw jokers
+    joker_box = TextBox(
+        jokers_text, font, (jokers_x, (ui_bar_height - font.get_height())//2),
+        (255, 80, 80) if jokers_left == 0 else (0, 180, 255), (40, 44, 52), 18, 6, 12, align="topright"
+    )
+    joker_box.draw(surface)
+
+    # Réponse IA (centered horizontally, vertically in bar)
+    ai_guess_color = (255, 80, 80) if last_ai_guess == challenge_word.lower() else (255, 255, 0)
+    ai_guess_font = get_font(32, bold=True)
+    ai_guess_box = TextBox(
+        f"Réponse IA : {last_ai_guess}", ai_guess_font, (WIDTH//2, ui_bar_height//2),
+        ai_guess_color, (60, 63, 65), 24, 8, 12, align="center"
+    )
+    ai_guess_box.draw(surface)
+    return pygame.Rect(0, 0, WIDTH, ui_bar_height)
+
+def draw_help_bar(surface, brush_color):
+    """Draw the controls bar with the selected colour highlighted; returns the rect to update."""
+    help_bar_height = 50
+    help_font = get_font(24)
+    pygame.draw.rect(surface, (60, 63, 65), (0, HEIGHT-help_bar_height, WIDTH, help_bar_height), border_radius=0)
+
+    # Draw color shortcuts with swatches and selected indicator
+    color_shortcuts = [
+        ("[N]", BLACK, pygame.K_n),  # Noir (Black)
+        ("[R]", RED, pygame.K_r),
+        ("[V]", GREEN, pygame.K_v),  # Vert (Green)
+        ("[J]", YELLOW, pygame.K_j), # Jaune (Yellow)
+        ("[B]", BLUE, pygame.K_b),   # Bleu (Blue)
+    ]
+    color_shortcut_width = 90 * len(color_shortcuts)
+    other_help = "[C] Effacer   [U] Annuler   [↑/↓] Taille   [P] Passer (joker)   [Q] Quitter"
+    other_surf = render_text(help_font, other_help, (200, 200, 200))
+    other_width = other_surf.get_width()
+    total_width = color_shortcut_width + 20 + other_width
+    x_start = (WIDTH - total_width) // 2
+    x = x_start
+    y = HEIGHT - help_bar_height // 2 - 10
+    for key, color, kcode in color_shortcuts:
+        surf = render_text(help_font, key, (220, 220, 220))
+        surface.blit(surf, (x, y))
+        rect = pygame.Rect(x + 45, y + 5, 28, 18)
+        pygame.draw.rect(surface, color, rect, border_radius=4)
+        # Draw border if this color is selected
+        if brush_color == color:
+            pygame.draw.rect(surface, (255, 255, 255), rect.inflate(6, 6), 3, border_radius=6)
+        x += 90
+    # Draw other controls text, centered after color shortcuts
+    other_rect = other_surf.get_rect(midleft=(x + 20, HEIGHT - help_bar_height // 2))
+    surface.blit(other_surf, other_rect)
+    return pygame.Rect(0, HEIGHT - help_bar_height, WIDTH, help_bar_height)
+
+def draw_frame_overlay(surface, area, frame_times, clock):
+    """Frame-time readout in the bottom-left corner of `area`; returns the rect to update."""
+    text = (
+        f"{sum(frame_times) / len(frame_times):.1f} ms/frame (max {max(frame_times):.1f})  "
+        f"{clock.get_fps():.0f} FPS"
+    )
+    rect = pygame.Rect(area.left, area.bottom - 28, 320, 28)
+    surface.fill((40, 44, 52), rect)
+    surface.blit(get_font(18).render(text, True, (0, 200, 0)), (rect.left + 8, rect.top + 4))
+    return rect
+
 def main():
+    scheduler = GuessScheduler(backend)
     while True:
         # --- Main Menu Screen ---
         menu = True
+        # The menu is static: draw it once
+        screen.fill((40, 44, 52))  # Dark background
+        pygame.draw.rect(screen, (60, 63, 65), (WIDTH//2-350, HEIGHT//2-150, 700, 300), border_radius=30)
+        # Centered main menu texts
+        menu_font = get_font(32, bold=True)
+        menu_items = [
+            ("Jeu Skribbl IA (Édition Pygame)", (0, 180, 255)),
+            ("Dessinez le mot dans la fenêtre Pygame.", (220, 220, 220)),
+            ("[C] Effacer  [B] Noir  [R] Rouge  [G] Vert  [Y] Jaune  [Q] Quitter", (200, 200, 200)),
+            (f"Durée : {GAME_DURATION} secondes", (200, 200, 200)),
+            ("Appuyez sur [ESPACE] pour commencer", (255, 140, 0)),
+        ]
+        y_start = HEIGHT//2 - 110
+        for i, (text, color) in enumerate(menu_items):
+            surf = render_text(menu_font, text, color)
+            rect = surf.get_rect(center=(WIDTH//2, y_start + i*50))
+            screen.blit(surf, rect)
+        pygame.display.update()
         while menu:
-            screen.fill((40, 44, 52))  # Dark background
-            pygame.draw.rect(screen, (60, 63, 65), (WIDTH//2-350, HEIGHT//2-150, 700, 300), border_radius=30)
-            # Centered main menu texts
-            menu_font = pygame.font.SysFont("Segoe UI Symbol", 32, bold=True)
-            menu_items = [
-                ("Jeu Skribbl IA (Édition Pygame)", (0, 180, 255)),
-                ("Dessinez le mot dans la fenêtre Pygame.", (220, 220, 220)),
-                ("[C] Effacer  [B] Noir  [R] Rouge  [G] Vert  [Y] Jaune  [Q] Quitter", (200, 200, 200)),
-                (f"Durée : {GAME_DURATION} secondes", (200, 200, 200)),
-                ("Appuyez sur [ESPACE] pour commencer", (255, 140, 0)),
-            ]
-            y_start = HEIGHT//2 - 110
-            for i, (text, color) in enumerate(menu_items):
-                surf = menu_font.render(text, True, color)
-                rect = surf.get_rect(center=(WIDTH//2, y_start + i*50))
-                screen.blit(surf, rect)
-            pygame.display.update()
+            clock.tick(30)
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     pygame.quit()
@@ -163,9 +248,6 @@ def main():
         drawing = False
         last_ai_guess = ""
         challenge_word = random.choice(challenge_words)
-        ai_guess = ""
-        ai_guess_time = 0
-        word_start = time.time()
         guessed = False
         brush_color = BLACK
         brush_size = BRUSH_SIZE
@@ -173,38 +255,31 @@ def main():
         screen.fill((245, 245, 245))
         pygame.draw.rect(screen, (60, 63, 65), (0,0,WIDTH,60), border_radius=0)
 
-        guess_requested = threading.Event()
+        canvas_bg = (245, 245, 245)
+        # Strokes on the drawing area (excludes the top and bottom UI bars)
+        strokes = StrokeStore(pygame.Rect(0, 60, WIDTH, HEIGHT - 60 - 50))
+        # Display updates: rects changed this frame, or a full flip after a clear / new word
+        full_redraw = True
+        dirty_rects = []
+        drawn_top_state = drawn_brush_color = None
+        show_frame_times = False
+        frame_times = deque(maxlen=60)  # work per frame in ms, excluding the tick sleep
 
-        def ai_guess_thread():
-            nonlocal last_ai_guess, guessed, score
-            ui_bar_height = 60
-            help_bar_height = 50
-            drawing_height = HEIGHT - ui_bar_height - help_bar_height
-            while running and (time.time() - start_time) < GAME_DURATION:
-                guess_requested.wait()  # Wait until user requests a guess
-                if not running:
-                    break
-                # Capture only the drawing area (exclude top and bottom UI bars)
-                sub_surface = screen.subsurface(pygame.Rect(0, ui_bar_height, WIDTH, drawing_height)).copy()
-                data = pygame.image.tostring(sub_surface, 'RGB')
-                img = Image.frombytes('RGB', (WIDTH, drawing_height), data)
-                buffered = BytesIO()
-                img.save(buffered, format="PNG")
-                buffered.seek(0)
-                image = base64.b64encode(buffered.read()).decode("utf-8")
-                guess = image_to_text_guess(client, MISTRAL_MODEL, AI_PROMPT, image)
-                print(f"Mot à deviner: {challenge_word} | Réponse de l'IA: {guess}")
-                last_ai_guess = guess
-                if challenge_word.lower() in guess:
-                    guessed = True
-                    score += 1
-                guess_requested.clear()  # Reset for next action
+        def request_guess():
+            """Hand a copy of the current strokes to the guess scheduler."""
+            scheduler.submit(strokes.snapshot(), challenge_word)
 
-        t = threading.Thread(target=ai_guess_thread, daemon=True)
-        t.start()
+        def finish_drawing(word):
+            if RECORD_DIR and strokes.strokes:
+                save_drawing(strokes, word, RECORD_DIR)
+            strokes.clear()
+
+        scheduler.invalidate()  # nothing from the previous game may land
+        scheduler.reset_stats()
 
         # Main game loop
         while running and (time.time() - start_time) < GAME_DURATION:
+            frame_start = time.perf_counter()
             pygame.event.pump()
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -214,13 +289,11 @@ def main():
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     if event.button == 1 and event.pos[1] > 60:
                         drawing = True
-                        last_pos = pygame.mouse.get_pos()
+                        dirty_rects.append(strokes.begin(screen, brush_color, brush_size, event.pos))
                 elif event.type == pygame.MOUSEBUTTONUP:
                     if event.button == 1:
                         drawing = False
-                        if 'last_pos' in locals():
-                            del last_pos
-                        guess_requested.set()  # Request AI guess after drawing
+                        request_guess()  # Request AI guess after drawing
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_q:
                         running = False
@@ -229,7 +302,28 @@ def main():
                     if event.key == pygame.K_c:
                         screen.fill(WHITE)
                         pygame.draw.rect(screen, (230,230,230), (0,0,WIDTH,60))
-                        guess_requested.set()  # Request AI guess after clear
+                        canvas_bg = WHITE
+                        strokes.clear()
+                        full_redraw = True
+                        scheduler.invalidate()
+                        request_guess()  # Request AI guess after clear
+                    if event.key == pygame.K_u and not drawing:
+                        # Undo: repaint only the area the last stroke covered
+                        undone = strokes.undo()
+                        if undone is not None:
+                            undone = undone.clip(strokes.area)
+                            screen.fill(canvas_bg, undone)
+                            strokes.render(screen, undone)
+                            dirty_rects.append(undone)
+                            request_guess()
+                    if event.key == pygame.K_f:
+                        show_frame_times = not show_frame_times
+                        if not show_frame_times:
+                            # Uncover the strokes under the overlay
+                            overlay = pygame.Rect(strokes.area.left, strokes.area.bottom - 28, 320, 28)
+                            screen.fill(canvas_bg, overlay)
+                            strokes.render(screen, overlay)
+                            dirty_rects.append(overlay)
                     if event.key == pygame.K_r:
                         brush_color = RED
                     if event.key == pygame.K_n:
@@ -248,121 +342,55 @@ def main():
                         # Use a joker to skip the word
                         jokers_left -= 1
                         words_guessed.append(f"(joker) {challenge_word}")
+                        finish_drawing(challenge_word)
                         available_words = [w for w in challenge_words if w not in words_guessed]
                         if not available_words:
                             running = False
                             break
                         challenge_word = random.choice(available_words)
+                        scheduler.invalidate()
                         guessed = False
                         last_ai_guess = ""
                         screen.fill(WHITE)
                         pygame.draw.rect(screen, (230,230,230), (0,0,WIDTH,60))
-                        word_start = time.time()
+                        canvas_bg = WHITE
+                        full_redraw = True
+
+            # Apply guesses that arrived for the current word and drawing
+            for word, guess in scheduler.poll():
+                last_ai_guess = guess
+                if word.lower() in guess and not guessed:
+                    guessed = True
+                    score += 1
 
             if drawing:
                 mx, my = pygame.mouse.get_pos()
                 if my > 60:
-                    if 'last_pos' in locals():
-                        pygame.draw.line(screen, brush_color, last_pos, (mx, my), brush_size)
-                    else:
-                        pygame.draw.circle(screen, brush_color, (mx, my), brush_size // 2)
-                    last_pos = (mx, my)
-            else:
-                if 'last_pos' in locals():
-                    del last_pos
-
-            # Draw all previous lines (already drawn on the screen)
-            # UI bar
-            pygame.draw.rect(screen, (60, 63, 65), (0,0,WIDTH,60), border_radius=0)
-            # Center vertical for all top UI texts (bar height = 60)
-            ui_bar_height = 60
-            # Mot à dessiner
-            mot_box = TextBox(
-                f"Mot à dessiner : {challenge_word}", font, (30, (ui_bar_height - font.get_height())//2),
-                (0, 180, 255), (40, 44, 52), 18, 6, 12, align="topleft"
-            )
-            mot_box.draw(screen)
-
-            # Timer, Score, Jokers (right-aligned, with consistent gap)
-            gap = 18
-            timer_font = pygame.font.SysFont("Segoe UI Symbol", 32, bold=True)
-            timer_text = f"⏰ {max(0, int(GAME_DURATION - (time.time() - start_time)))}s"
-            score_text = f"Score : {score}"
-            jokers_text = f"Jokers : {jokers_left}"
-            # Render surfaces to get widths
-            timer_surf = timer_font.render(timer_text, True, (255, 140, 0))
-            score_surf = font.render(score_text, True, (0, 200, 0))
-            jokers_surf = font.render(jokers_text, True, (255, 80, 80) if jokers_left == 0 else (0, 180, 255))
-            timer_width = timer_surf.get_width() + 2*18  # padding_x
-            score_width = score_surf.get_width() + 2*18
-            jokers_width = jokers_surf.get_width() + 2*18
-            # Positions (right-aligned)
-            timer_x = WIDTH - 30
-            score_x = timer_x - timer_width - gap
-            jokers_x = score_x - score_width - gap
-            # Draw timer
-            timer_box = TextBox(
-                timer_text, timer_font, (timer_x, (ui_bar_height - timer_font.get_height())//2),
-                (255, 140, 0), (40, 44, 52), 18, 6, 12, align="topright"
-            )
-            timer_box.draw(screen)
-            # Draw score
-            score_box = TextBox(
-                score_text, font, (score_x, (ui_bar_height - font.get_height())//2),
-                (0, 200, 0), (40, 44, 52), 18, 6, 12, align="topright"
-            )
-            score_box.draw(screen)
-            # Draw jokers
-            joker_box = TextBox(
-                jokers_text, font, (jokers_x, (ui_bar_height - font.get_height())//2),
-                (255, 80, 80) if jokers_left == 0 else (0, 180, 255), (40, 44, 52), 18, 6, 12, align="topright"
-            )
-            joker_box.draw(screen)
-
-            # Réponse IA (centered horizontally, vertically in bar)
-            ai_guess_color = (255, 80, 80) if last_ai_guess == challenge_word.lower() else (255, 255, 0)
-            ai_guess_font = pygame.font.SysFont("Segoe UI Symbol", 32, bold=True)
-            ai_guess_box = TextBox(
-                f"Réponse IA : {last_ai_guess}", ai_guess_font, (WIDTH//2, ui_bar_height//2),
-                ai_guess_color, (60, 63, 65), 24, 8, 12, align="center"
+                    dirty = strokes.extend(screen, (mx, my))
+                    if dirty:
+                        dirty_rects.append(dirty)
+
+            # Bars are redrawn only when what they show has changed
+            top_state = (
+                challenge_word, max(0, int(GAME_DURATION - (time.time() - start_time))),
+                score, jokers_left, last_ai_guess,
             )
-            ai_guess_box.draw(screen)
-
-            # Controls (help) at the bottom of the screen
-            help_bar_height = 50
-            help_font = pygame.font.SysFont("Segoe UI Symbol", 24)
-            pygame.draw.rect(screen, (60, 63, 65), (0, HEIGHT-help_bar_height, WIDTH, help_bar_height), border_radius=0)
-
-            # Draw color shortcuts with swatches and selected indicator
-            color_shortcuts = [
-                ("[N]", BLACK, pygame.K_n),  # Noir (Black)
-                ("[R]", RED, pygame.K_r),
-                ("[V]", GREEN, pygame.K_v),  # Vert (Green)
-                ("[J]", YELLOW, pygame.K_j), # Jaune (Yellow)
-                ("[B]", BLUE, pygame.K_b),   # Bleu (Blue)
-            ]
-            color_shortcut_width = 90 * len(color_shortcuts)
-            other_help = "[C] Effacer   [↑/↓] Taille   [P] Passer (joker)   [Q] Quitter"
-            other_surf = help_font.render(other_help, True, (200, 200, 200))
-            other_width = other_surf.get_width()
-            total_width = color_shortcut_width + 20 + other_width
-            x_start = (WIDTH - total_width) // 2
-            x = x_start
-            y = HEIGHT - help_bar_height // 2 - 10
-            for key, color, kcode in color_shortcuts:
-                surf = help_font.render(key, True, (220, 220, 220))
-                screen.blit(surf, (x, y))
-                rect = pygame.Rect(x + 45, y + 5, 28, 18)
-                pygame.draw.rect(screen, color, rect, border_radius=4)
-                # Draw border if this color is selected
-                if brush_color == color:
-                    pygame.draw.rect(screen, (255, 255, 255), rect.inflate(6, 6), 3, border_radius=6)
-                x += 90
-            # Draw other controls text, centered after color shortcuts
-            other_rect = other_surf.get_rect(midleft=(x + 20, HEIGHT - help_bar_height // 2))
-            screen.blit(other_surf, other_rect)
-
-            pygame.display.update()
+            if full_redraw or top_state != drawn_top_state:
+                dirty_rects.append(draw_top_bar(screen, *top_state))
+                drawn_top_state = top_state
+            if full_redraw or brush_color != drawn_brush_color:
+                dirty_rects.append(draw_help_bar(screen, brush_color))
+                drawn_brush_color = brush_color
+            if show_frame_times and frame_times:
+                dirty_rects.append(draw_frame_overlay(screen, strokes.area, frame_times, clock))
+
+            if full_redraw:
+                pygame.display.update()
+            elif dirty_rects:
+                pygame.display.update(dirty_rects)
+            full_redraw = False
+            dirty_rects.clear()
+            frame_times.append((time.perf_counter() - frame_start) * 1000)
             clock.tick(60)
 
             if guessed:
@@ -385,9 +413,13 @@ def main():
                     }
                     for _ in range(confetti_count)
                 ]
+                drawing_area = pygame.Rect(0, drawing_top, WIDTH, drawing_height)
+                word_surf = get_font(72, bold=True).render(last_ai_guess.upper(), True, (255, 200, 0))
+                word_rect = word_surf.get_rect(center=(WIDTH//2, drawing_top + drawing_height//2))
+                screen.set_clip(drawing_area)
                 while pygame.time.get_ticks() - animation_start < animation_duration:
                     # Redraw only the drawing area (not UI bars)
-                    pygame.draw.rect(screen, (245,245,245), (0, drawing_top, WIDTH, drawing_height))
+                    pygame.draw.rect(screen, (245,245,245), drawing_area)
                     # Draw confetti in drawing area only
                     for c in confetti:
                         if drawing_top <= c['y'] <= drawing_bottom:
@@ -398,33 +430,38 @@ def main():
                             c['x'] = random.randint(0, WIDTH)
                     # Flashing guessed word centered in drawing area
                     if ((pygame.time.get_ticks() - animation_start) // 200) % 2 == 0:
-                        word_font = pygame.font.SysFont("Segoe UI Symbol", 72, bold=True)
-                        word_surf = word_font.render(last_ai_guess.upper(), True, (255, 200, 0))
-                        word_rect = word_surf.get_rect(center=(WIDTH//2, drawing_top + drawing_height//2))
                         screen.blit(word_surf, word_rect)
-                    # Redraw UI bars on top
-                    pygame.draw.rect(screen, (60, 63, 65), (0,0,WIDTH,ui_bar_height), border_radius=0)
-                    pygame.draw.rect(screen, (60, 63, 65), (0, HEIGHT-help_bar_height, WIDTH, help_bar_height), border_radius=0)
-                    pygame.display.update()
+                    pygame.display.update(drawing_area)
                     clock.tick(60)
+                screen.set_clip(None)
                 pygame.time.wait(300)
                 words_guessed.append(challenge_word)
+                finish_drawing(challenge_word)
                 # Pick a new word
                 available_words = [w for w in challenge_words if w not in words_guessed]
                 if not available_words:
                     running = False
                     break
                 challenge_word = random.choice(available_words)
+                scheduler.invalidate()
                 guessed = False
                 last_ai_guess = ""
                 screen.fill(WHITE)
                 pygame.draw.rect(screen, (230,230,230), (0,0,WIDTH,60))
-                word_start = time.time()
+                canvas_bg = WHITE
+                full_redraw = True
+
+        scheduler.invalidate()
+        print(
+            "Requêtes IA : {submitted} demandées, {sent} envoyées, {cancelled} annulées, "
+            "{stale} obsolètes ignorées, {errors} erreurs".format(**scheduler.stats)
+        )
+        print(scheduler.cache.summary())
 
         # After game ends, show end screen and wait for user to return to menu
         screen.fill((40, 44, 52))
         pygame.draw.rect(screen, (60, 63, 65), (WIDTH//2-375, HEIGHT//2-140, 750, 280), border_radius=20)
-        end_font = pygame.font.SysFont("Segoe UI Symbol", 28, bold=True)
+        end_font = get_font(28, bold=True)
         end_items = [
             ("Partie terminée !", (255, 80, 80)),
             (f"Votre score : {score} mot(s) devinés par l'IA en {GAME_DURATION} secondes.", (220, 220, 220)),
@@ -446,6 +483,7 @@ def main():
         pygame.display.update()
         waiting = True
         while waiting:
+            clock.tick(30)
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     pygame.quit()